@@ -1,235 +1,358 @@
 import streamlit as st
 import pandas as pd
-import io
-import xlsxwriter
 import altair as alt
-import streamlit.components.v1 as components
-import re
+import os
+from smartrab.parser import parse_files
+from smartrab.parse_cache import ParseCache
+from smartrab.schedule import s_curve, weekly_plan, division_cashflow
+from smartrab.memo import TableVersions, MemoCache
+from smartrab.export import tender_package_bytes
+from smartrab.calc import IncrementalCalculator, FUZZY_MIN_SCORE
+from smartrab.profiling import Profiler
+from smartrab.engine import merge_parse_results, ensure_rab_columns, RAB_DEFAULTS
+from smartrab.schema import apply_schema, empty_table, editable, plain
+from smartrab.master import MasterCatalog, MasterRegistry, content_key
+from smartrab.project import ProjectBundle, ProjectError, project_bytes, META_KEYS, EXTENSION
+from smartrab.scenario import scenario_grid, parse_numbers, category_costs, run_scenarios, CATEGORIES, DEFAULT_PPN
+from smartrab.jobs import ImportJob
+from smartrab.paging import SearchIndex, PAGE_SIZES, page_bounds, has_edits, apply_editor_delta
 
 # ==========================================
 # 0. HELPER FUNCTIONS & CONFIG
 # ==========================================
 st.set_page_config(page_title="SmartRAB-SNI Pro", layout="wide", page_icon="🏗️")
 
-def clean_currency(val):
-    """Membersihkan format uang (Rp 1.000.000 -> 1000000)"""
-    if pd.isna(val) or val == '': return 0.0
-    s = str(val).replace('Rp', '').replace('.', '').replace(' ', '').replace(',', '.')
-    try: return float(s)
-    except: return 0.0
-
-def normalize_text(text):
-    """Normalisasi teks untuk pencocokan (lowercase, no simbol)"""
-    if not isinstance(text, str): return ""
-    return text.lower().strip().replace('"', '').replace("'", "")
-
-def detect_division(filename):
-    """Mendeteksi Divisi berdasarkan Nama File"""
-    fn = filename.lower()
-    if 'persiapan' in fn or 'bongkaran' in fn: return "Divisi 1: Umum & Persiapan"
-    if 'tanah' in fn or 'galian' in fn or 'timbunan' in fn: return "Divisi 2: Pekerjaan Tanah"
-    if 'pondasi' in fn or 'beton' in fn or 'baja' in fn or 'struktur' in fn: return "Divisi 3: Struktur"
-    if 'dinding' in fn or 'plesteran' in fn or 'lantai' in fn: return "Divisi 4: Arsitektur"
-    if 'pintu' in fn or 'jendela' in fn or 'kaca' in fn or 'kusen' in fn: return "Divisi 5: Kusen & Pintu"
-    if 'atap' in fn or 'plafon' in fn: return "Divisi 6: Atap & Plafon"
-    if 'cat' in fn or 'pengecatan' in fn: return "Divisi 7: Pengecatan"
-    if 'sanitair' in fn or 'air' in fn or 'pipa' in fn or 'drainase' in fn: return "Divisi 8: MEP & Sanitasi"
-    if 'listrik' in fn or 'elektrikal' in fn: return "Divisi 9: Elektrikal"
-    return "Divisi 10: Lain-lain"
-
 # ==========================================
 # 1. BRUTAL PARSER ENGINE (PENYEDOT DEBU)
 # ==========================================
-def process_bulk_files(uploaded_files):
+def process_bulk_files(uploaded_files, columnar=True, parallel=False, on_progress=None, cache=None, shared=False):
     """
     Versi BRUTAL: Menyedot data tanpa peduli struktur header.
     Asumsi: 
     1. Ada kolom Teks (Uraian)
     2. Ada kolom Angka (Koefisien/Harga)
+    Mode columnar=True memakai engine C + heuristik per kolom (jauh lebih cepat),
+    columnar=False memakai jalur lama per baris.
+    parallel=True mem-parse file di process pool; hasil tetap digabung urut upload.
+    cache (ParseCache) melewati parsing untuk file yang isinya sudah pernah di-parse.
+    shared=True (sesi belum punya data sendiri): master dibangun sekali per isi file
+    & dibagi read-only ke semua sesi yang meng-upload file yang sama. Jika sesi sudah
+    memakai master bersama, file baru digabung di atasnya (kunci = master lama + file baru).
     """
-    msg_container = []
-    new_analyses = []
-    
-    # Keyword untuk mendeteksi file Master Harga
-    price_keywords = ['upah', 'bahan', 'harga', 'basic', 'dasar']
-    
-    for f in uploaded_files:
-        try:
-            # Deteksi Divisi dari Nama File
-            fname = f.name.lower()
-            detected_div = detect_division(fname)
-            
-            # Baca File (Header None = Baca apa adanya dari baris 0)
-            f.seek(0)
-            # Menggunakan engine 'python' agar lebih tahan banting terhadap error baris
-            df_raw = pd.read_csv(f, header=None, engine='python', on_bad_lines='skip')
-            
-            # CEK 1: Apakah ini File HARGA DASAR?
-            is_price_file = any(k in fname for k in price_keywords)
-            
-            if is_price_file:
-                # Logika Master Harga: Cari baris yang ada 'Rp' atau angka besar
-                price_data = []
-                for _, row in df_raw.iterrows():
-                    # Ubah row jadi list string untuk dicek
-                    vals = [str(x).strip() for x in row.values if pd.notna(x)]
-                    
-                    # Cari angka harga (biasanya > 100 dan bukan tahun)
-                    found_price = 0
-                    found_desc = ""
-                    found_unit = "Unit"
-                    found_code = ""
-                    
-                    for v in vals:
-                        # Coba bersihkan format uang
-                        clean_v = clean_currency(v)
-                        if clean_v > 50: # Asumsi harga minimal 50 perak
-                            found_price = clean_v
-                        elif len(v) > 3 and not v[0].isdigit(): # Kemungkinan Deskripsi
-                            found_desc = v
-                        elif len(v) <= 5 and v.isalpha(): # Kemungkinan Satuan
-                            found_unit = v
-                        elif ("M." in v or "L." in v or "E." in v): # Kemungkinan Kode
-                            found_code = v
-                            
-                    if found_price > 0 and found_desc:
-                        cat = 'Upah' if 'L.' in found_code else ('Alat' if 'E.' in found_code else 'Material')
-                        price_data.append({
-                            'Kode': found_code, 'Komponen': found_desc, 
-                            'Satuan': found_unit, 'Harga_Dasar': found_price, 'Kategori': cat
-                        })
-                
-                if price_data:
-                    df_new = pd.DataFrame(price_data)
-                    st.session_state['df_prices'] = pd.concat([st.session_state['df_prices'], df_new]).drop_duplicates(subset=['Komponen'], keep='last')
-                    msg_container.append(f"✅ Master Harga: {f.name} ({len(price_data)} item)")
-            
-            else:
-                # CEK 2: Ini File ANALISA
-                # Logika: Cari baris yang punya Angka Kecil (Koefisien) dan Teks
-                file_items = 0
-                current_parent_code = "X.0.0"
-                current_parent_desc = f"Item dari {f.name}"
-                
-                # Regex untuk mendeteksi Kode Analisa (Contoh: A.2.2.1 atau 2.2.1)
-                regex_code = re.compile(r'^([A-Z]\.|[\d]+\.)[\d\.]+$')
-                
-                for _, row in df_raw.iterrows():
-                    # Ambil nilai yang tidak kosong
-                    vals = [v for v in row.values if pd.notna(v) and str(v).strip() != '']
-                    if len(vals) < 2: continue
-                    
-                    # Cek apakah ini HEADER PEKERJAAN? (Biasanya di kolom awal ada Kode A.x.x)
-                    str_vals = [str(x).strip() for x in vals]
-                    potential_code = str_vals[0]
-                    
-                    if regex_code.match(potential_code) and len(str_vals) >= 2:
-                        current_parent_code = potential_code
-                        # Deskripsi biasanya elemen kedua terpanjang
-                        current_parent_desc = max(str_vals, key=len) 
-                        continue
-                        
-                    # Cek apakah ini KOMPONEN? (Harus ada angka desimal/koefisien)
-                    has_coef = False
-                    coef_val = 0
-                    comp_name = ""
-                    
-                    for v in vals:
-                        try:
-                            # Cek apakah angka float (koefisien)
-                            vv = float(str(v).replace(',', '.'))
-                            if 0.0001 <= vv <= 500.0: # Range koefisien masuk akal
-                                has_coef = True
-                                coef_val = vv
-                        except:
-                            # Jika bukan angka, mungkin ini nama komponen
-                            s = str(v).strip()
-                            if len(s) > 3 and not regex_code.match(s): # Bukan kode
-                                comp_name = s
-                    
-                    if has_coef and comp_name and current_parent_code != "X.0.0":
-                        new_analyses.append({
-                            'Kode_Analisa': current_parent_code,
-                            'Uraian_Pekerjaan': current_parent_desc,
-                            'Komponen': comp_name,
-                            'Koefisien': coef_val,
-                            'Divisi_Ref': detected_div
-                        })
-                        file_items += 1
-                
-                if file_items > 0:
-                    msg_container.append(f"✅ Analisa: {f.name} ({file_items} baris)")
-                else:
-                    msg_container.append(f"⚠️ {f.name}: Format tidak standar, mencoba skip.")
-
-        except Exception as e:
-            msg_container.append(f"❌ Error Fatal {f.name}: {str(e)}")
-
-    # Simpan Hasil Analisa
-    if new_analyses:
-        df_new = pd.DataFrame(new_analyses)
-        st.session_state['df_analysis'] = pd.concat([st.session_state['df_analysis'], df_new], ignore_index=True)
-        # Hapus duplikat
-        st.session_state['df_analysis'] = st.session_state['df_analysis'].drop_duplicates(subset=['Kode_Analisa', 'Komponen'])
-        
+    prof = get_profiler()
+    with prof.stage('process_bulk_files', rows=len(uploaded_files)):
+        if shared and session_is_pristine():
+            base = st.session_state.get('_master')
+            key = content_key(uploaded_files, base=base.key if base is not None else '')
+            name = f"{base.name} + {len(uploaded_files)} file upload" if base is not None else f"{len(uploaded_files)} file upload"
+            cat = master_registry().get_or_build(key, lambda: MasterCatalog.from_files(
+                uploaded_files, name=name, key=key, base=base,
+                columnar=columnar, parallel=parallel, on_progress=on_progress, cache=cache, profiler=prof))
+            attach_master(cat)
+            return cat.msgs or [f"♻️ Master bersama dipakai ulang ({len(cat.prices)} harga, {len(cat.analysis)} baris analisa)"]
+        results = parse_files(uploaded_files, columnar=columnar, parallel=parallel, on_progress=on_progress, cache=cache, profiler=prof)
+        ss = st.session_state
+        with prof.stage('merge_uploads') as stage:
+            df_prices, df_analysis, msg_container = merge_parse_results(ss['df_prices'], ss['df_analysis'], results)
+            stage.rows = len(df_prices) + len(df_analysis)
+        if df_prices is not ss['df_prices']: set_table('df_prices', df_prices)
+        if df_analysis is not ss['df_analysis']: set_table('df_analysis', df_analysis)
     return msg_container
 
+@st.cache_resource
+def master_registry():
+    """Registry master bersama (satu per proses server)"""
+    return MasterRegistry()
+
+@st.cache_resource
+def default_master(directory):
+    """Master dari direktori CSV (env SMARTRAB_MASTER_DIR), di-parse sekali per proses"""
+    cat = MasterCatalog.from_dir(directory, cache=get_parse_cache())
+    return master_registry().get_or_build(cat.key, lambda: cat)
+
+def attach_master(cat):
+    """Pakai katalog bersama di sesi ini: tabel dirujuk (bukan disalin), calculator di-fork"""
+    set_table('df_prices', cat.prices)
+    set_table('df_analysis', cat.analysis)
+    st.session_state['_calc_engine'] = cat.fork_calculator()
+    st.session_state['_master'] = cat
+    for k in ('df_analysis_detailed', 'df_material_rekap', '_calc_key'): st.session_state.pop(k, None)
+
+def session_is_pristine():
+    """True jika tabel master sesi masih kosong / masih persis milik katalog bersama"""
+    ss, cat = st.session_state, st.session_state.get('_master')
+    if cat is not None: return ss['df_prices'] is cat.prices and ss['df_analysis'] is cat.analysis
+    return ss['df_prices'].empty and ss['df_analysis'].empty
+
+def start_import(uploaded_files, parallel=False, cache=None):
+    """Mulai import massal di thread latar belakang (satu job per sesi); UI tetap bisa dipakai"""
+    job = ImportJob(uploaded_files, parallel=parallel, cache=cache, profiler=get_profiler()).start()
+    st.session_state['_import_job'] = job
+    st.session_state.pop('_import_log', None)
+    return job
+
+def commit_import(job):
+    """Gabungkan hasil file yang sudah selesai ke tabel sesi (urut upload). Return: jumlah file yang digabung"""
+    def merge(ready):
+        ss = st.session_state
+        with get_profiler().stage('merge_uploads', rows=len(ready)):
+            df_prices, df_analysis, _ = merge_parse_results(ss['df_prices'], ss['df_analysis'], ready)
+        if df_prices is not ss['df_prices']: set_table('df_prices', df_prices)
+        if df_analysis is not ss['df_analysis']: set_table('df_analysis', df_analysis)
+    return job.commit(merge)
+
+@st.fragment(run_every=1.0)
+def import_progress():
+    """Panel progres import latar belakang: hasil parsial digabung setiap kali panel diperbarui"""
+    ss = st.session_state
+    job = ss.get('_import_job')
+    if job is None: return
+    commit_import(job)
+    if not job.pending_commit:
+        # Selesai / dibatalkan & semua hasil sudah digabung -> hitung sekali, lalu rerun seluruh halaman
+        ss.pop('_import_job')
+        ss['_import_log'] = (job.state, job.error, job.elapsed, list(job.log))
+        calculate_system()
+        st.rerun()
+    st.progress(job.done / max(job.total, 1), text=f"{job.done}/{job.total} file · {job.elapsed:.0f} dtk"
+                + (" · membatalkan..." if job.cancelling else ""))
+    for line in job.log[-5:]: st.caption(line)
+    if not job.cancelling and st.button("⛔ Batalkan Import"):
+        job.cancel()
+
+def get_parse_cache():
+    """ParseCache default; None jika direktori cache tidak bisa dibuat"""
+    try: return ParseCache()
+    except OSError: return None
+
 # ==========================================
 # 2. LOGIC SISTEM (LINKING HARGA & RAB)
 # ==========================================
 def calculate_system():
-    df_p = st.session_state['df_prices'].copy()
-    df_a = st.session_state['df_analysis'].copy()
-    df_r = st.session_state['df_rab'].copy()
-    overhead_factor = 1 + (st.session_state.get('global_overhead', 15.0) / 100)
-
-    # 1. Normalisasi Key untuk Matching
-    df_p['Key'] = df_p['Komponen'].apply(normalize_text)
-    df_a['Key_Raw'] = df_a['Komponen'].apply(normalize_text)
-    
-    # 2. Kamus Harga (Lookup Dictionary)
-    price_dict = dict(zip(df_p['Key'], df_p['Harga_Dasar']))
-    satuan_dict = dict(zip(df_p['Key'], df_p['Satuan']))
-    kategori_dict = dict(zip(df_p['Key'], df_p['Kategori']))
-    
-    # 3. Fungsi Pencarian Harga (Smart Match)
-    def find_best_price(key_search):
-        # A. Exact Match
-        if key_search in price_dict:
-            return price_dict[key_search], satuan_dict.get(key_search, '-'), kategori_dict.get(key_search, 'Material')
-        # B. Partial Match (Misal: "Semen" -> "Semen Portland")
-        for k_db, price in price_dict.items():
-            if (key_search in k_db and len(key_search)>3) or (k_db in key_search and len(k_db)>3):
-                return price, satuan_dict.get(k_db, '-'), kategori_dict.get(k_db, 'Material')
-        return 0.0, '-', 'Material'
-
-    # 4. Terapkan Harga ke Analisa
-    results = df_a['Key_Raw'].apply(find_best_price)
-    df_a['Harga_Dasar'] = [res[0] for res in results]
-    df_a['Satuan'] = [res[1] for res in results]
-    df_a['Kategori'] = [res[2] for res in results]
-    df_a['Subtotal'] = df_a['Koefisien'] * df_a['Harga_Dasar']
+    # Lewati jika tabel sumber & overhead tidak berubah sejak hitungan terakhir
+    ov = st.session_state.get('global_overhead', 15.0)
+    calc_key = (table_version('df_prices'), table_version('df_analysis'), table_version('df_rab'), ov)
+    if st.session_state.get('_calc_key') == calc_key and 'df_analysis_detailed' in st.session_state: return
     
-    st.session_state['df_analysis_detailed'] = df_a
+    if '_calc_engine' not in st.session_state:
+        st.session_state['_calc_engine'] = IncrementalCalculator()
+    engine = st.session_state['_calc_engine']
+    engine.profiler = get_profiler()
+    with engine.profiler.stage('calculate_system', rows=len(st.session_state['df_analysis'])):
+        det, df_r, mat = engine.recalc(
+            st.session_state['df_prices'], st.session_state['df_analysis'],
+            st.session_state['df_rab'], ov)
+        # Hanya tabel yang berubah yang diganti (versi view turunan lain tetap valid)
+        for name, df in (('df_analysis_detailed', det), ('df_rab', df_r), ('df_material_rekap', mat)):
+            if name in engine.updated or name not in st.session_state: set_table(name, df)
+    st.session_state['analysis_index'] = engine.index
+    st.session_state['_calc_key'] = (table_version('df_prices'), table_version('df_analysis'), table_version('df_rab'), ov)
 
-    # 5. Hitung Harga Satuan Jadi (Harsat)
-    unit_prices = df_a.groupby('Kode_Analisa')['Subtotal'].sum().reset_index()
-    unit_prices['Harga_Kalkulasi'] = unit_prices['Subtotal'] * overhead_factor 
-    
-    # 6. Update RAB
-    df_r['Kode_Analisa_Ref'] = df_r['Kode_Analisa_Ref'].astype(str).str.strip()
-    unit_prices['Kode_Analisa'] = unit_prices['Kode_Analisa'].astype(str).str.strip()
-    
-    df_r_temp = pd.merge(df_r, unit_prices[['Kode_Analisa', 'Harga_Kalkulasi']], left_on='Kode_Analisa_Ref', right_on='Kode_Analisa', how='left')
-    df_r['Harga_Satuan_Jadi'] = df_r_temp['Harga_Kalkulasi'].fillna(0)
-    df_r['Total_Harga'] = df_r['Volume'] * df_r['Harga_Satuan_Jadi']
-    st.session_state['df_rab'] = df_r
+# ==========================================
+# 2b. VERSI TABEL & CACHE VIEW TURUNAN
+# ==========================================
+def get_profiler():
+    """Profiler tahap per sesi (nonaktif sampai dinyalakan di panel Diagnostik)"""
+    if '_profiler' not in st.session_state: st.session_state['_profiler'] = Profiler()
+    return st.session_state['_profiler']
+
+def data_versions():
+    if '_versions' not in st.session_state: st.session_state['_versions'] = TableVersions()
+    return st.session_state['_versions']
+
+def table_version(name):
+    """Versi tabel di session_state (naik setiap kali tabelnya diganti)"""
+    return data_versions().get(name, st.session_state.get(name))
+
+SCHEMA_OF = {'df_prices': 'prices', 'df_analysis': 'analysis', 'df_rab': 'rab', 'df_analysis_detailed': 'analysis_detailed'}
+
+def set_table(name, df):
+    """Simpan tabel ke session_state (dengan skema bertipe) & naikkan versinya"""
+    if name in SCHEMA_OF: df = apply_schema(df, SCHEMA_OF[name])
+    st.session_state[name] = df
+    data_versions().bump(name, df)
+
+def memo_view(view, deps, fn, *params):
+    """Hasil fn() di-cache per (view, versi tabel deps, params) dalam LRU terbatas"""
+    if '_memo' not in st.session_state: st.session_state['_memo'] = MemoCache(max_entries=128)
+    key = (view, tuple(table_version(d) for d in deps), params)
+    return st.session_state['_memo'].get_or_compute(key, fn)
+
+def catalog_items(sel_div="Semua"):
+    """Satu baris per Kode_Analisa untuk dropdown katalog (opsional difilter per Divisi)"""
+    def build():
+        if sel_div != "Semua":
+            items = catalog_items()
+            return items[items['Divisi_Ref'] == sel_div]
+        # Tabel header ternormalisasi (satu baris per Kode_Analisa)
+        unique_items = st.session_state['analysis_index'].headers.copy()
+        # 1. Pastikan kolom Divisi_Ref ada
+        if 'Divisi_Ref' not in unique_items.columns:
+            unique_items['Divisi_Ref'] = "Umum"
+        # 2. Bersihkan Data Kosong (NaN) menjadi string "Umum" agar fungsi sorted() tidak crash
+        unique_items['Divisi_Ref'] = plain(unique_items['Divisi_Ref']).fillna("Umum").astype(str)
+        unique_items['Label'] = plain(unique_items['Uraian_Pekerjaan'])
+        return unique_items
+    return memo_view('catalog_items', ['df_analysis_detailed'], build, sel_div)
+
+def catalog_labels(sel_div="Semua"):
+    """(daftar Label unik, Label -> baris item pertama) untuk dropdown Pilih Item"""
+    def build():
+        items = catalog_items(sel_div)
+        first = items.drop_duplicates(subset=['Label'])
+        return items['Label'].unique(), dict(zip(first['Label'], first.to_dict('records')))
+    return memo_view('catalog_labels', ['df_analysis_detailed'], build, sel_div)
 
-    # 7. Rekap Material
-    mat_bk = pd.merge(df_r[['Kode_Analisa_Ref', 'Volume']], df_a[['Kode_Analisa', 'Komponen', 'Satuan', 'Koefisien', 'Harga_Dasar']], left_on='Kode_Analisa_Ref', right_on='Kode_Analisa', how='left')
-    mat_bk['Total_Kebutuhan'] = mat_bk['Volume'] * mat_bk['Koefisien']
-    mat_bk['Total_Biaya'] = mat_bk['Total_Kebutuhan'] * mat_bk['Harga_Dasar']
-    st.session_state['df_material_rekap'] = mat_bk.groupby(['Komponen', 'Satuan']).agg({'Total_Kebutuhan': 'sum', 'Total_Biaya': 'sum'}).reset_index()
+def catalog_divisions():
+    return memo_view('catalog_divisions', ['df_analysis_detailed'],
+                     lambda: sorted(catalog_items()['Divisi_Ref'].unique()))
+
+def catalog_search(sel_div="Semua"):
+    """Index pencarian atas Label unik katalog (+ Kode_Analisa) untuk dropdown Pilih Item"""
+    def build():
+        labels, label_rows = catalog_labels(sel_div)
+        return SearchIndex(labels, [label_rows[l]['Kode_Analisa'] for l in labels])
+    return memo_view('catalog_search', ['df_analysis_detailed'], build, sel_div)
+
+def code_search():
+    """Index pencarian Kode_Analisa + Uraian_Pekerjaan (dropdown kode di tab RAB & ANALISA)"""
+    def build():
+        idx = st.session_state['analysis_index']
+        return SearchIndex(idx.codes, [idx.uraian[c] for c in idx.codes])
+    return memo_view('code_search', ['df_analysis_detailed'], build)
+
+MAX_OPTIONS = 200
+
+def search_select(label, values, index, key, box=st):
+    """Selectbox + kotak cari: hanya maksimal MAX_OPTIONS hasil yang dikirim ke browser"""
+    query = box.text_input(f"🔍 Cari {label}", key=f'{key}_q', placeholder="kata kunci / kode")
+    hits = index.search(query)
+    if len(hits) > MAX_OPTIONS:
+        box.caption(f"{len(hits):,} cocok, ditampilkan {MAX_OPTIONS} pertama. Perjelas pencarian.")
+    return box.selectbox(label, [values[i] for i in hits[:MAX_OPTIONS]])
+
+def paged_editor(name, search_cols, key, defaults=None, prepare=None, counter=None, **editor_kwargs):
+    """
+    st.data_editor per halaman dengan pencarian. Hanya potongan halaman yang dikirim ke browser
+    & diperiksa; perubahan diterapkan sebagai delta baris ke tabel penuh.
+    Return: tabel penuh yang sudah diubah, atau None jika tidak ada perubahan.
+    """
+    df = st.session_state[name]
+    index = memo_view(f'search:{name}', [name], lambda: SearchIndex(*(df[c] for c in search_cols if c in df.columns)))
+    c1, c2, c3 = st.columns([3, 1, 1])
+    query = c1.text_input("🔍 Cari", key=f'{key}_q', placeholder="kata kunci, kode, divisi...")
+    size = c2.selectbox("Baris / halaman", PAGE_SIZES, index=1, key=f'{key}_size')
+    hits = memo_view(f'search_hits:{name}', [name], lambda: index.search(query), query)
+    pages = page_bounds(len(hits), 1, size)[2]
+    page = c3.number_input(f"Halaman (dari {pages})", 1, pages, 1, key=f'{key}_page_{pages}')
+    start, stop, _ = page_bounds(len(hits), page, size)
+    positions = hits[start:stop]
+    view = df.iloc[positions]
+    if prepare is not None: view = prepare(view)
+    st.caption(f"Baris {start + 1 if stop else 0:,}–{stop:,} dari {len(hits):,}" + (f" (total {len(df):,})" if query else ""))
+    editor_key = f"{key}_{table_version(name)}_{size}_{page}_{query}"
+    st.data_editor(view, key=editor_key, use_container_width=True, num_rows="dynamic", **editor_kwargs)
+    state = st.session_state.get(editor_key)
+    return apply_editor_delta(df, positions, state, defaults, counter) if has_edits(state) else None
+
+def scenario_results(scenarios):
+    """Perbandingan skenario (matriks skenario x kode) di-cache per versi analisa detail, RAB & isi tabel skenario"""
+    costs = memo_view('category_costs', ['df_analysis_detailed'], lambda: category_costs(st.session_state['df_analysis_detailed']))
+    params = tuple(map(tuple, scenarios.astype(object).itertuples(index=False)))
+    return memo_view('scenarios', ['df_analysis_detailed', 'df_rab'],
+                     lambda: run_scenarios(costs, st.session_state['df_rab'], scenarios), params)
+
+def render_scenarios():
+    """Expander REKAP: grid skenario (overhead, indeks harga daerah, eskalasi per kategori, PPN) & perbandingannya"""
+    ss = st.session_state
+    with st.expander("🧮 Bandingkan Skenario (overhead, indeks harga, eskalasi, PPN)"):
+        st.caption("Semua skenario dihitung sekaligus dari hasil pencocokan harga yang sudah ada (tanpa hitung ulang per skenario). "
+                   "Daftar nilai dipisah ';', koma desimal boleh.")
+        c1, c2, c3 = st.columns(3)
+        ovs = c1.text_input("Overhead (%)", "10; 12,5; 15; 17,5; 20")
+        idxs = c2.text_input("Indeks harga daerah", "0,95; 1; 1,1")
+        ppns = c3.text_input("PPN (%)", f"{DEFAULT_PPN:g}")
+        esc_cols = st.columns(len(CATEGORIES))
+        esc = {k: col.number_input(f"Eskalasi {k} (%)", -50.0, 200.0, 0.0, step=1.0) for k, col in zip(CATEGORIES, esc_cols)}
+        if st.button("🔁 Buat Grid Skenario") or '_scenarios' not in ss:
+            ss['_scenario_rev'] = ss.get('_scenario_rev', 0) + 1  # editor baru (delta editor lama tidak terbawa)
+            try:
+                ss['_scenarios'] = scenario_grid(parse_numbers(ovs) or [ss['global_overhead']], parse_numbers(idxs) or [1.0],
+                                                 parse_numbers(ppns) or [DEFAULT_PPN], esc)
+            except ValueError:
+                st.error("Format angka tidak valid (contoh: 10; 12,5; 15)")
+                ss.setdefault('_scenarios', scenario_grid([ss['global_overhead']]))
+        scenarios = st.data_editor(ss['_scenarios'], num_rows="dynamic", use_container_width=True, hide_index=True,
+                                   key=f"scenario_editor_{ss['_scenario_rev']}")
+        if scenarios.empty: return
+        summary, divisions = scenario_results(scenarios)
+        st.dataframe(summary, use_container_width=True, hide_index=True, column_config={
+            c: st.column_config.NumberColumn(format="Rp %d") for c in ('Total_Fisik', 'PPN_Rp', 'Grand_Total')
+        } | {"Selisih_Persen": st.column_config.NumberColumn(format="%.2f %%")})
+        chart = alt.Chart(summary).mark_bar().encode(x=alt.X('Skenario', sort=None), y='Grand_Total', tooltip=['Skenario', 'Grand_Total', 'Selisih_Persen'])
+        st.altair_chart(chart, use_container_width=True)
+        st.caption("Total per divisi (sebelum PPN):")
+        st.dataframe(divisions, use_container_width=True)
+
+def rekap_divisi():
+    return memo_view('rekap_divisi', ['df_rab'],
+                     lambda: st.session_state['df_rab'].groupby('Divisi')['Total_Harga'].sum().reset_index())
+
+def tender_package(build=True):
+    """
+    Bytes Paket Tender (.xlsx) untuk data saat ini. Hanya hasil terakhir yang disimpan (ukurannya besar).
+    build=False: kembalikan None bila belum dibuat / sudah basi, tanpa menulis ulang.
+    """
+    ss = st.session_state
+    project = {k: ss.get(k, '') for k in ('project_name', 'project_loc', 'project_year')}
+    key = (tuple(table_version(n) for n in ('df_rab', 'df_analysis_detailed', 'df_prices', 'df_material_rekap')),
+           ss.get('global_overhead', 15.0), tuple(project.values()))
+    cached = ss.get('_tender_pkg')
+    if cached and cached[0] == key: return cached[1]
+    if not build: return None
+    data = tender_package_bytes(ss['df_rab'], ss['df_analysis_detailed'], ss['df_prices'],
+                                ss.get('df_material_rekap', pd.DataFrame()), ss.get('global_overhead', 15.0),
+                                project=project, index=ss.get('analysis_index'))
+    ss['_tender_pkg'] = (key, data)
+    return data
+
+def project_file(build=True):
+    """
+    Bytes file proyek (.srab) untuk data saat ini (harga, analisa, RAB, analisa detail & metadata).
+    build=False: kembalikan None bila belum dibuat / sudah basi.
+    """
+    ss = st.session_state
+    meta = {k: ss.get(k) for k in META_KEYS}
+    key = (tuple(table_version(n) for n in ('df_prices', 'df_analysis', 'df_rab', 'df_analysis_detailed')), tuple(meta.values()))
+    cached = ss.get('_project_file')
+    if cached and cached[0] == key: return cached[1]
+    if not build: return None
+    tables = {'prices': ss['df_prices'], 'analysis': ss['df_analysis'], 'rab': ss['df_rab']}
+    engine = ss.get('_calc_engine')
+    if engine is not None and engine.det is not None:
+        tables['analysis_detailed'], tables['matches'] = engine.snapshot()
+    data = project_bytes(tables, meta)
+    ss['_project_file'] = (key, data)
+    return data
+
+def open_project(source):
+    """Muat file proyek ke sesi; hasil pencocokan & analisa detail dipulihkan tanpa dihitung ulang"""
+    bundle = ProjectBundle(source)
+    # Baca semua tabel dulu: file rusak (ProjectError) tidak meninggalkan sesi setengah termuat
+    tables = {t: bundle.table(t) for t in ('prices', 'analysis', 'rab', 'analysis_detailed', 'matches') if t in bundle}
+    ss = st.session_state
+    for k in META_KEYS:
+        if k in bundle.meta: ss[k] = bundle.meta[k]
+    for name, table in (('df_prices', 'prices'), ('df_analysis', 'analysis'), ('df_rab', 'rab')):
+        set_table(name, tables[table] if table in tables else empty_table(table))
+    if ensure_rab_columns(ss['df_rab']): data_versions().bump('df_rab', ss['df_rab'])
+    engine = IncrementalCalculator()
+    if 'analysis_detailed' in bundle and 'matches' in bundle:
+        engine.restore(ss['df_prices'], ss['df_analysis'], bundle.table('analysis_detailed'), bundle.table('matches'))
+    ss['_calc_engine'] = engine
+    for k in ('_master', 'df_analysis_detailed', 'df_material_rekap', '_calc_key'): ss.pop(k, None)
+    calculate_system()
+    return bundle
 
 # ==========================================
 # 3. UI SIDEBAR & NAVIGASI (REVISI ANTI-ERROR)
@@ -243,14 +366,60 @@ def render_sidebar():
         uploaded_files = st.file_uploader("Drop file di sini:", accept_multiple_files=True, type=['csv'], key="bulk_upload")
         
         if uploaded_files:
-            if st.button("🚀 Proses Semua File"):
+            parallel = st.checkbox("⚡ Paralel (semua core CPU)", value=len(uploaded_files) > 1)
+            use_cache = st.checkbox("♻️ Pakai cache parse (file yang sama tidak di-parse ulang)", value=True)
+            shared = st.checkbox("🤝 Bagikan master antar sesi (read-only)", value=False,
+                                 disabled=not session_is_pristine(), help="Hanya untuk sesi yang belum punya data harga/analisa sendiri")
+            background = st.checkbox("🕒 Jalankan di latar belakang (tab lain tetap bisa dibuka)", value=not shared, disabled=shared,
+                                     help="Hasil tiap file langsung digabung; analisa dihitung ulang sekali setelah selesai")
+            job = st.session_state.get('_import_job')
+            if background and not shared:
+                if st.button("🚀 Proses Semua File", disabled=job is not None):
+                    start_import(uploaded_files, parallel=parallel, cache=get_parse_cache() if use_cache else None)
+            elif st.button("🚀 Proses Semua File", disabled=job is not None):
+                bar = st.progress(0.0)
+                status = st.empty()
+                def on_progress(done, total, msg):
+                    bar.progress(done / total, text=f"{done}/{total} file")
+                    status.caption(msg)
                 with st.spinner("Sedang membaca & memetakan data..."):
-                    logs = process_bulk_files(uploaded_files)
+                    logs = process_bulk_files(uploaded_files, parallel=parallel, on_progress=on_progress, cache=get_parse_cache() if use_cache else None, shared=shared)
                     calculate_system()
                 st.success("Selesai!")
                 for log in logs:
                     st.caption(log)
+
+        if '_import_job' in st.session_state:
+            import_progress()
+        elif '_import_log' in st.session_state:
+            state, error, elapsed, logs = st.session_state['_import_log']
+            (st.error if error else st.success)(f"Import {state} ({elapsed:.1f} dtk)" + (f": {error}" if error else ""))
+            for log in logs:
+                st.caption(log)
     
+    # --- PROYEK: SIMPAN / BUKA ---
+    with st.sidebar.expander("💾 2. Proyek (Simpan / Buka)"):
+        if st.button("💾 Siapkan File Proyek"):
+            with st.spinner("Menulis file proyek..."):
+                project_file()
+        data = project_file(build=False)
+        if data is not None:
+            st.download_button(f"⬇️ Download Proyek ({EXTENSION})", data, mime="application/octet-stream",
+                               file_name=f"{st.session_state['project_name']}{EXTENSION}")
+        project_upload = st.file_uploader("Buka proyek:", type=[EXTENSION.lstrip('.')], key="project_upload")
+        if project_upload is not None and st.button("📂 Buka Proyek"):
+            try:
+                with st.spinner("Membuka proyek..."):
+                    bundle = open_project(project_upload)
+                st.success(f"Proyek dibuka: {bundle.rows('analysis'):,} baris analisa, {bundle.rows('rab'):,} baris RAB")
+            except ProjectError as e:
+                st.error(str(e))
+
+    cat = st.session_state.get('_master')
+    if cat is not None:
+        status = "dipakai" if session_is_pristine() else "dasar, harga sudah diubah di sesi ini"
+        st.sidebar.caption(f"🤝 Master bersama ({status}): {cat.name} · {len(cat.prices)} harga · "
+                           f"{len(cat.analysis)} baris analisa · ~{cat.memory_mb():.0f} MB")
     st.sidebar.markdown("---")
     
     # --- KATALOG VIEW ---
@@ -258,35 +427,21 @@ def render_sidebar():
     df_det = st.session_state['df_analysis_detailed']
     
     if not df_det.empty:
-        # Grouping untuk Sidebar Dropdown
-        unique_items = df_det.drop_duplicates(subset=['Kode_Analisa']).copy() 
-        
-        # --- PERBAIKAN ERROR DI SINI ---
-        # 1. Pastikan kolom Divisi_Ref ada
-        if 'Divisi_Ref' not in unique_items.columns:
-            unique_items['Divisi_Ref'] = "Umum"
-        
-        # 2. Bersihkan Data Kosong (NaN) menjadi string "Umum" agar fungsi sorted() tidak crash
-        unique_items['Divisi_Ref'] = unique_items['Divisi_Ref'].fillna("Umum").astype(str)
-        # -------------------------------
-            
-        div_list = sorted(unique_items['Divisi_Ref'].unique())
+        # Grouping untuk Sidebar Dropdown (di-cache per versi tabel analisa)
+        div_list = catalog_divisions()
         sel_div = st.sidebar.selectbox("Filter Divisi:", ["Semua"] + list(div_list))
         
-        if sel_div != "Semua":
-            unique_items = unique_items[unique_items['Divisi_Ref'] == sel_div]
-            
         # Pilih Item
-        unique_items['Label'] = unique_items['Uraian_Pekerjaan']
-        sel_item_label = st.sidebar.selectbox("Pilih Item:", unique_items['Label'].unique())
+        labels, label_rows = catalog_labels(sel_div)
+        sel_item_label = search_select("Pilih Item:", labels, catalog_search(sel_div), 'sidebar_item', box=st.sidebar)
         
         # Detail Item
         if sel_item_label:
-            item_row = unique_items[unique_items['Label'] == sel_item_label].iloc[0]
+            item_row = label_rows[sel_item_label]
             ov_factor = 1 + (st.session_state.get('global_overhead', 15)/100)
             
             # Hitung Harga Realtime
-            est_price = df_det[df_det['Kode_Analisa'] == item_row['Kode_Analisa']]['Subtotal'].sum() * ov_factor
+            est_price = st.session_state['analysis_index'].subtotal(item_row['Kode_Analisa']) * ov_factor
             
             st.sidebar.info(f"Kode: {item_row['Kode_Analisa']}\nHarga: Rp {est_price:,.0f}")
             
@@ -305,7 +460,7 @@ def render_sidebar():
                     'Harga_Satuan_Jadi': 0, 'Total_Harga': 0,
                     'Durasi_Minggu': dur, 'Minggu_Mulai': 1
                 }
-                st.session_state.df_rab = pd.concat([st.session_state.df_rab, pd.DataFrame([new_row])], ignore_index=True)
+                set_table('df_rab', pd.concat([st.session_state.df_rab, pd.DataFrame([new_row])], ignore_index=True))
                 calculate_system()
                 st.rerun()
 
@@ -317,27 +472,29 @@ def initialize_data():
     for k, v in defaults.items():
         if k not in st.session_state: st.session_state[k] = v
 
+    # Master bersama dari server (opsional): dirujuk read-only, tidak disalin per sesi
+    master_dir = os.environ.get('SMARTRAB_MASTER_DIR')
+    if master_dir and 'df_prices' not in st.session_state and os.path.isdir(master_dir):
+        attach_master(default_master(master_dir))
+
     # Init DataFrame
     if 'df_prices' not in st.session_state:
         # Default minimal agar tidak error sebelum upload
-        st.session_state['df_prices'] = pd.DataFrame(columns=['Kode', 'Komponen', 'Satuan', 'Harga_Dasar', 'Kategori'])
+        st.session_state['df_prices'] = empty_table('prices')
     
     if 'df_analysis' not in st.session_state:
         # Default minimal
-        st.session_state['df_analysis'] = pd.DataFrame(columns=['Kode_Analisa', 'Uraian_Pekerjaan', 'Komponen', 'Koefisien', 'Divisi_Ref'])
+        st.session_state['df_analysis'] = empty_table('analysis')
 
     if 'df_rab' not in st.session_state:
-        st.session_state['df_rab'] = pd.DataFrame(columns=[
-            'No', 'Divisi', 'Uraian_Pekerjaan', 'Kode_Analisa_Ref', 'Satuan_Pek', 
-            'Volume', 'Harga_Satuan_Jadi', 'Total_Harga', 'Durasi_Minggu', 'Minggu_Mulai'
-        ])
+        st.session_state['df_rab'] = empty_table('rab')
 
     # Cek & Fix Struktur Table
-    cols_rab = ['Durasi_Minggu', 'Minggu_Mulai', 'Kode_Analisa_Ref']
-    for c in cols_rab:
-        if c not in st.session_state['df_rab'].columns:
-            st.session_state['df_rab'][c] = 1 if c != 'Kode_Analisa_Ref' else ''
+    if ensure_rab_columns(st.session_state['df_rab']):
+        data_versions().bump('df_rab', st.session_state['df_rab'])
 
+    # Selama import latar belakang berjalan tabel masih parsial -> hitung sekali saat import selesai
+    if '_import_job' in st.session_state and 'df_analysis_detailed' in st.session_state: return
     calculate_system()
 
 # ==========================================
@@ -357,21 +514,18 @@ def render_sni_html(kode, uraian, df_part, ov):
     html += f"<tr style='font-weight:bold; color:blue;'><td>HARGA JADI (+{ov}%)</td><td></td><td style='text-align:right;'>Rp {total*(1+ov/100):,.0f}</td></tr></table></div>"
     return html
 
-def to_excel(df):
-    out = io.BytesIO()
-    with pd.ExcelWriter(out, engine='xlsxwriter') as w: df.to_excel(w, index=False)
-    return out.getvalue()
-
 def main():
     initialize_data()
-    render_sidebar()
+    prof = get_profiler()
+    with prof.stage('render:sidebar'):
+        render_sidebar()
     
     st.title("🏗️ SmartRAB-SNI (Enterprise Edition)")
     
     tabs = st.tabs(["📊 REKAP", "📝 RAB", "🔍 ANALISA DETIL", "💰 HARGA DASAR", "🧱 MATERIAL", "📈 KURVA-S"])
 
     # --- TAB 1: REKAP ---
-    with tabs[0]:
+    with tabs[0], prof.stage('render:REKAP'):
         st.header("Rekapitulasi Biaya")
         
         c1, c2 = st.columns([3, 1])
@@ -384,6 +538,8 @@ def main():
                 st.rerun()
                 
             if st.button("🗑️ Hapus Semua Data (Reset)"):
+                if '_import_job' in st.session_state: st.session_state['_import_job'].cancel()
+                if '_profiler' in st.session_state: st.session_state['_profiler'].disable()
                 st.session_state.clear()
                 st.rerun()
 
@@ -391,31 +547,41 @@ def main():
             df = st.session_state['df_rab']
             if not df.empty:
                 # Group by Divisi
-                rekap = df.groupby('Divisi')['Total_Harga'].sum().reset_index()
+                rekap = rekap_divisi()
                 st.dataframe(rekap, use_container_width=True, hide_index=True, column_config={"Total_Harga": st.column_config.NumberColumn(format="Rp %d")})
                 
                 gt = rekap['Total_Harga'].sum()
                 ppn = gt * 0.11
                 st.success(f"### TOTAL FISIK: Rp {gt:,.0f}")
                 st.info(f"### GRAND TOTAL (+PPN 11%): Rp {gt+ppn:,.0f}")
+
+                if st.button("📦 Siapkan Paket Tender (Excel)"):
+                    with st.spinner("Menulis workbook..."):
+                        tender_package()
+                pkg = tender_package(build=False)
+                if pkg is not None:
+                    st.download_button("⬇️ Download Paket Tender (.xlsx)", pkg,
+                                       file_name=f"Paket_Tender_{st.session_state['project_name']}.xlsx",
+                                       mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+                render_scenarios()
             else:
                 st.warning("Data RAB masih kosong.")
 
     # --- TAB 2: RAB ---
-    with tabs[1]:
+    with tabs[1], prof.stage('render:RAB'):
         st.header("Rincian RAB")
         
         # Input Tengah (Manual)
         with st.expander("➕ Tambah Manual"):
             df_det = st.session_state.get('df_analysis_detailed', pd.DataFrame())
             if not df_det.empty:
-                codes = df_det['Kode_Analisa'].unique()
-                c_sel = st.selectbox("Pilih Kode:", codes)
+                codes = st.session_state['analysis_index'].codes
+                c_sel = search_select("Pilih Kode:", codes, code_search(), 'rab_manual_code')
                 c_div = st.text_input("Divisi:", "Pekerjaan Umum")
                 c_vol = st.number_input("Volume:", 1.0)
                 
                 if st.button("Simpan Item"):
-                    desc = df_det[df_det['Kode_Analisa']==c_sel].iloc[0]['Uraian_Pekerjaan']
+                    desc = st.session_state['analysis_index'].uraian[c_sel]
                     new_row = {
                         'No': len(st.session_state.df_rab)+1,
                         'Divisi': c_div,
@@ -425,79 +591,111 @@ def main():
                         'Volume': c_vol,
                         'Harga_Satuan_Jadi': 0, 'Total_Harga': 0, 'Durasi_Minggu': 1, 'Minggu_Mulai': 1
                     }
-                    st.session_state.df_rab = pd.concat([st.session_state.df_rab, pd.DataFrame([new_row])], ignore_index=True)
+                    set_table('df_rab', pd.concat([st.session_state.df_rab, pd.DataFrame([new_row])], ignore_index=True))
                     calculate_system()
                     st.rerun()
 
-        # Tabel RAB Editor
-        df_rab = st.session_state['df_rab']
-        edited = st.data_editor(df_rab, use_container_width=True, num_rows="dynamic", column_config={
+        # Tabel RAB Editor (per halaman; hanya baris yang diedit yang diterapkan)
+        edited = paged_editor('df_rab', ['Uraian_Pekerjaan', 'Kode_Analisa_Ref', 'Divisi'], 'editor_rab', defaults=RAB_DEFAULTS,
+                              counter='No', column_config={
             "Total_Harga": st.column_config.NumberColumn(format="Rp %d", disabled=True),
             "Harga_Satuan_Jadi": st.column_config.NumberColumn(format="Rp %d", disabled=True)
         })
         
-        if not edited.equals(df_rab):
-            st.session_state['df_rab'] = edited
+        if edited is not None:
+            set_table('df_rab', edited)
             calculate_system()
             st.rerun()
 
     # --- TAB 3: ANALISA ---
-    with tabs[2]:
+    with tabs[2], prof.stage('render:ANALISA'):
         st.header("Bedah Analisa")
         df_det = st.session_state['df_analysis_detailed']
         
         if not df_det.empty:
-            all_codes = df_det['Kode_Analisa'].unique()
-            sel_code = st.selectbox("Cari Analisa:", all_codes)
+            idx = st.session_state['analysis_index']
+            sel_code = search_select("Analisa:", idx.codes, code_search(), 'analisa_code')
             
             if sel_code:
-                part = df_det[df_det['Kode_Analisa'] == sel_code]
-                desc = part.iloc[0]['Uraian_Pekerjaan']
+                part = idx.part(sel_code)
+                desc = idx.uraian[sel_code]
                 st.markdown(render_sni_html(sel_code, desc, part, st.session_state['global_overhead']), unsafe_allow_html=True)
+            
+            with st.expander("🔎 Kualitas Pencocokan Harga Komponen"):
+                report = memo_view('match_report', ['df_analysis_detailed'], lambda: st.session_state['_calc_engine'].match_report())
+                m1, m2, m3 = st.columns(3)
+                m1.metric("Cocok (exact/substring)", int(report['Metode'].isin(['exact', 'partial']).sum()))
+                m2.metric("Cocok fuzzy", int((report['Metode'] == 'fuzzy').sum()))
+                m3.metric("Tidak ketemu (harga 0)", int((report['Metode'] == 'tidak ketemu').sum()))
+                st.caption(f"Fuzzy aktif jika skor ≥ {FUZZY_MIN_SCORE}. Daftar di bawah: hasil fuzzy & komponen tanpa harga, skor terendah dulu.")
+                st.dataframe(report[~report['Metode'].isin(['exact', 'partial'])].sort_values('Skor'), use_container_width=True, hide_index=True)
         else:
             st.info("Belum ada data analisa. Silakan Upload File di Sidebar.")
 
     # --- TAB 4: HARGA DASAR ---
-    with tabs[3]:
+    with tabs[3], prof.stage('render:HARGA DASAR'):
         st.header("Master Harga (Upah & Bahan)")
-        df_p = st.session_state['df_prices']
-        edited_p = st.data_editor(df_p, use_container_width=True, num_rows="dynamic", key='editor_harga')
+        # Kolom kategori ditampilkan sebagai teks agar Satuan / Kategori baru bisa diketik
+        edited_p = paged_editor('df_prices', ['Komponen', 'Kode', 'Kategori'], 'editor_harga', prepare=editable)
         
-        if not edited_p.equals(df_p):
-            st.session_state['df_prices'] = edited_p
+        if edited_p is not None:
+            set_table('df_prices', edited_p)
             calculate_system()
             st.rerun()
 
     # --- TAB 5: MATERIAL ---
-    with tabs[4]:
+    with tabs[4], prof.stage('render:MATERIAL'):
         st.header("Rekap Kebutuhan Sumber Daya")
         if 'df_material_rekap' in st.session_state:
             st.dataframe(st.session_state['df_material_rekap'], use_container_width=True)
 
     # --- TAB 6: KURVA S ---
-    with tabs[5]:
+    with tabs[5], prof.stage('render:KURVA-S'):
         st.header("Jadwal & Kurva S")
-        df = st.session_state['df_rab'].copy()
+        df = st.session_state['df_rab']
         if df['Total_Harga'].sum() > 0:
-            df['Bobot'] = (df['Total_Harga'] / df['Total_Harga'].sum()) * 100
-            max_week = int(df.apply(lambda x: x['Minggu_Mulai'] + x['Durasi_Minggu'] - 1, axis=1).max())
-            if max_week < 1: max_week = 1
+            df_curve = memo_view('s_curve', ['df_rab'], lambda: s_curve(df))
+            with prof.stage('chart', rows=len(df_curve)):
+                chart = alt.Chart(df_curve).mark_line(point=True).encode(x='Minggu', y='Progress', tooltip=['Minggu', 'Progress']).interactive()
+                st.altair_chart(chart, use_container_width=True)
             
-            curve_data = []
-            cum = 0
-            for w in range(1, max_week + 2):
-                val = 0
-                for _, r in df.iterrows():
-                    if r['Minggu_Mulai'] <= w < (r['Minggu_Mulai'] + r['Durasi_Minggu']):
-                        val += (r['Bobot'] / r['Durasi_Minggu'])
-                cum = min(cum + val, 100)
-                curve_data.append({'Minggu': w, 'Progress': cum})
-            
-            df_curve = pd.DataFrame(curve_data)
-            chart = alt.Chart(df_curve).mark_line(point=True).encode(x='Minggu', y='Progress', tooltip=['Minggu', 'Progress']).interactive()
-            st.altair_chart(chart, use_container_width=True)
+            with st.expander("💸 Rencana Cash Flow Mingguan per Divisi"):
+                st.dataframe(memo_view('division_cashflow', ['df_rab'], lambda: division_cashflow(weekly_plan(df))), use_container_width=True)
         else:
             st.warning("RAB masih kosong.")
 
+    render_diagnostics()
+
+def render_diagnostics():
+    """Panel Diagnostik: waktu, baris & delta memori per tahap (opt-in), export JSON lines"""
+    prof = get_profiler()
+    with st.expander("🩺 Diagnostik Performa", expanded=False):
+        on = st.toggle("Rekam waktu per tahap (menambah sedikit overhead)", value=prof.enabled)
+        if on != prof.enabled:
+            prof.enable() if on else prof.disable()
+            st.rerun()
+        mem = st.toggle("Ukur delta memori (tracemalloc: memperlambat semua sesi di server selama aktif)",
+                        value=prof.memory, disabled=not prof.enabled)
+        if mem != prof.memory:
+            prof.set_memory(mem)
+            st.rerun()
+        records = prof.records
+        if not records:
+            st.caption("Belum ada catatan. Nyalakan perekaman lalu upload / ubah data.")
+            return
+        df = pd.DataFrame(records)
+        summary = df.groupby('stage').agg(Jumlah=('seconds', 'size'), Total_dtk=('seconds', 'sum'),
+                                          Rata2_dtk=('seconds', 'mean'), Maks_dtk=('seconds', 'max'),
+                                          Baris_terakhir=('rows', 'last'), Memori_MB_maks=('mem_delta_mb', 'max'))
+        st.dataframe(summary.sort_values('Total_dtk', ascending=False), use_container_width=True)
+        st.caption("Catatan terbaru:")
+        st.dataframe(df.iloc[::-1].head(200), use_container_width=True, hide_index=True)
+        c1, c2 = st.columns(2)
+        c1.download_button("⬇️ Export JSON lines", prof.to_jsonl(), file_name=f"smartrab_profile_{prof.session}.jsonl",
+                           mime="application/x-ndjson")
+        if c2.button("🧹 Hapus catatan"):
+            prof.clear()
+            st.rerun()
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,4 @@
+"""
+SmartRAB-SNI core: logika parser & perhitungan tanpa ketergantungan Streamlit.
+Modul di sini bisa di-import oleh worker process pool maupun skrip batch.
+"""
@@ -0,0 +1,144 @@
+"""
+Benchmark pipeline per tahap dengan data sintetis (smartrab.synth).
+
+    python -m smartrab.bench --sizes 1k,10k,100k [--memory] [--save]
+
+Tahap: parse (parse_files + merge_parse_results = process_bulk_files),
+calculate (IncrementalCalculator.recalc penuh = calculate_system pertama),
+recalc_rab (ubah volume RAB lalu hitung ulang), kurva_s (s_curve + cash flow),
+export (Paket Tender .xlsx). Hasil dibandingkan dengan baseline JSON;
+--save menyimpan hasil run ini sebagai baseline baru.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from smartrab import synth
+from smartrab.calc import IncrementalCalculator
+from smartrab.engine import merge_parse_results
+from smartrab.export import write_tender_package
+from smartrab.parser import parse_files
+from smartrab.schema import empty_table
+from smartrab.schedule import s_curve, weekly_plan, division_cashflow
+
+DEFAULT_SIZES = '1k,10k,100k'
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'baseline.json')
+REGRESSION_RATIO = 1.25  # lebih lambat dari ini x baseline = regresi
+
+def parse_size(text):
+    """'1k' -> 1000, '1M' -> 1000000"""
+    text = text.strip().lower()
+    mult = {'k': 1_000, 'm': 1_000_000}.get(text[-1:], 1)
+    return int(float(text.rstrip('km')) * mult)
+
+def measure(fn, memory=False):
+    """(hasil, detik, peak MB atau None). Peak diukur dengan tracemalloc pada run terpisah."""
+    t0 = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - t0
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            fn()
+            peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        finally:
+            tracemalloc.stop()
+    return result, seconds, peak
+
+def run_size(n_rows, memory=False, parallel=False, overhead=15.0, log=print):
+    """Benchmark semua tahap untuk satu ukuran. Return: daftar dict hasil per tahap"""
+    files, df_rab = synth.project(n_rows)
+    out = []
+
+    def record(stage, fn, rows):
+        res, sec, peak = measure(fn, memory)
+        out.append({'size': n_rows, 'stage': stage, 'rows': rows, 'seconds': round(sec, 4),
+                    'peak_mb': round(peak, 1) if peak is not None else None})
+        log(f"{n_rows:>9,} {stage:<11} {sec:9.3f} s" + (f" {peak:9.1f} MB" if peak is not None else ''))
+        return res
+
+    empty_p, empty_a = empty_table('prices'), empty_table('analysis')
+    prices, analysis, _ = record('parse', lambda: merge_parse_results(
+        empty_p, empty_a, parse_files(files, parallel=parallel)), n_rows)
+    record('calculate', lambda: IncrementalCalculator().recalc(prices, analysis, df_rab, overhead), len(analysis))
+
+    calc = IncrementalCalculator()
+    det, rab_result, mat = calc.recalc(prices, analysis, df_rab, overhead)
+    changed = df_rab.copy()
+    changed.loc[changed.index[::10], 'Volume'] *= 1.1
+    variants = [df_rab, changed]
+    def recalc_rab():
+        variants.reverse()  # bergantian agar setiap run (termasuk run memori) benar-benar berubah
+        return calc.recalc(prices, analysis, variants[0], overhead)
+    record('recalc_rab', recalc_rab, len(changed))
+
+    record('kurva_s', lambda: (s_curve(rab_result), division_cashflow(weekly_plan(rab_result))), len(rab_result))
+    record('export', lambda: write_tender_package(io.BytesIO(), rab_result, det, prices, mat, overhead, index=calc.index),
+           len(det) + len(rab_result))
+    return out
+
+def compare(results, baseline, ratio=REGRESSION_RATIO):
+    """Baris perbandingan (size, stage, detik, baseline, rasio, status) terhadap baseline"""
+    base = {(r['size'], r['stage']): r for r in baseline.get('results', [])}
+    rows = []
+    for r in results:
+        b = base.get((r['size'], r['stage']))
+        if b is None or not b['seconds']:
+            rows.append((r['size'], r['stage'], r['seconds'], None, None, 'baru'))
+            continue
+        k = r['seconds'] / b['seconds']
+        rows.append((r['size'], r['stage'], r['seconds'], b['seconds'], k, 'REGRESI' if k > ratio else 'ok'))
+    return rows
+
+def load_baseline(path):
+    if not os.path.exists(path): return None
+    with open(path, encoding='utf-8') as fh: return json.load(fh)
+
+def save_baseline(path, results):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    data = {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(), 'pandas': pd.__version__, 'machine': platform.machine(),
+        'results': results
+    }
+    with open(path, 'w', encoding='utf-8') as fh: json.dump(data, fh, indent=1)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog='python -m smartrab.bench', description="Benchmark tahap pipeline SmartRAB dengan data sintetis.")
+    ap.add_argument('--sizes', default=DEFAULT_SIZES, help="Jumlah baris analisa, mis. 1k,10k,100k,1M")
+    ap.add_argument('--memory', action='store_true', help="Ukur peak memori (tracemalloc, run tambahan per tahap)")
+    ap.add_argument('--parallel', action='store_true', help="Parse file di process pool")
+    ap.add_argument('--baseline', default=DEFAULT_BASELINE, help="File baseline JSON")
+    ap.add_argument('--save', action='store_true', help="Simpan hasil sebagai baseline baru")
+    ap.add_argument('--ratio', type=float, default=REGRESSION_RATIO, help="Ambang regresi (x baseline)")
+    args = ap.parse_args(argv)
+
+    print(f"{'baris':>9} {'tahap':<11} {'waktu':>11}" + (f" {'peak':>12}" if args.memory else ''))
+    results = []
+    for n in (parse_size(s) for s in args.sizes.split(',') if s.strip()):
+        results += run_size(n, memory=args.memory, parallel=args.parallel)
+
+    regressed = False
+    baseline = load_baseline(args.baseline)
+    if baseline is not None:
+        print(f"\nDibanding baseline {args.baseline} ({baseline.get('created', '?')}):")
+        for size, stage, sec, base, k, status in compare(results, baseline, args.ratio):
+            ratio = f"{k:5.2f}x" if k is not None else '    -'
+            print(f"{size:>9,} {stage:<11} {sec:9.3f} s  vs {base if base is not None else '-':>8}  {ratio}  {status}")
+            regressed |= status == 'REGRESI'
+    if args.save:
+        save_baseline(args.baseline, results)
+        print(f"\nBaseline disimpan: {args.baseline}")
+    return 1 if regressed and not args.save else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,603 @@
+"""
+Mesin hitung: pencocokan harga (exact / substring / fuzzy), index analisa &
+perhitungan ulang inkremental RAB. Tidak bergantung pada Streamlit sehingga
+bisa dipakai oleh app, CLI batch, maupun worker process pool.
+"""
+import copy
+import re
+
+import numpy as np
+import pandas as pd
+
+from smartrab.parser import normalize_text
+from smartrab.profiling import NULL_PROFILER
+from smartrab.schema import apply_schema, assign_rows, analysis_headers, is_category, map_categories, plain
+
+class PriceMatcher:
+    """
+    Index pencocokan harga (dibangun sekali per tabel harga).
+    Hasilnya identik dengan scan linear lama: exact match dulu, lalu Key
+    pertama (urutan tabel) yang memuat / termuat di key pencarian & > 3 huruf.
+    - Key DB memuat key cari  -> inverted index trigram + verifikasi substring
+    - Key DB termuat key cari -> automaton Aho-Corasick atas semua Key DB
+    """
+    NOT_FOUND = (0.0, '-', 'Material')
+    MIN_LEN = 3
+
+    def __init__(self, keys, prices, satuans, kategoris):
+        # Urutan & nilai meniru dict(zip(...)): posisi = kemunculan pertama, nilai = terakhir
+        self.key_id = {}
+        self.payload = []
+        self.keys = []
+        for k, p, s, c in zip(keys, prices, satuans, kategoris):
+            if k in self.key_id:
+                self.payload[self.key_id[k]] = (p, s, c)
+                continue
+            self.key_id[k] = len(self.keys)
+            self.keys.append(k)
+            self.payload.append((p, s, c))
+        self._build_trigrams()
+        self._build_automaton()
+
+    @classmethod
+    def from_prices(cls, df_p):
+        """Bangun index dari df_prices yang sudah punya kolom 'Key'"""
+        return cls(df_p['Key'], df_p['Harga_Dasar'], df_p['Satuan'], df_p['Kategori'])
+
+    def _build_trigrams(self):
+        # trigram -> daftar id Key (urut naik) untuk kasus "Key DB memuat key cari"
+        postings = {}
+        for i, k in enumerate(self.keys):
+            if len(k) <= self.MIN_LEN: continue
+            for g in {k[j:j+3] for j in range(len(k) - 2)}:
+                postings.setdefault(g, []).append(i)
+        self.trigrams = postings
+
+    def _build_automaton(self):
+        # Aho-Corasick: goto per node, fail link & id terkecil yang berakhir di node
+        goto, fail, best = [{}], [0], [len(self.keys)]
+        for i, k in enumerate(self.keys):
+            if len(k) <= self.MIN_LEN: continue
+            node = 0
+            for ch in k:
+                nxt = goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[node][ch] = nxt
+                    goto.append({}); fail.append(0); best.append(len(self.keys))
+                node = nxt
+            best[node] = min(best[node], i)
+        queue = list(goto[0].values())
+        for node in queue:  # BFS (queue bertambah selama iterasi)
+            for ch, nxt in goto[node].items():
+                f = fail[node]
+                while f and ch not in goto[f]: f = fail[f]
+                fail[nxt] = goto[f][ch] if node and ch in goto[f] else 0
+                best[nxt] = min(best[nxt], best[fail[nxt]])
+                queue.append(nxt)
+        self.goto, self.fail, self.best = goto, fail, best
+
+    def _first_contained(self, key_search):
+        """Id terkecil Key DB (> 3 huruf) yang merupakan substring key_search"""
+        goto, fail, best = self.goto, self.fail, self.best
+        node, found = 0, len(self.keys)
+        for ch in key_search:
+            while node and ch not in goto[node]: node = fail[node]
+            node = goto[node].get(ch, 0)
+            if best[node] < found: found = best[node]
+        return found
+
+    def _first_containing(self, key_search, limit):
+        """Id terkecil (< limit) Key DB yang memuat key_search (> 3 huruf)"""
+        if len(key_search) <= self.MIN_LEN: return limit
+        lists = []
+        for j in range(len(key_search) - 2):
+            ids = self.trigrams.get(key_search[j:j+3])
+            if ids is None: return limit
+            lists.append(ids)
+        for i in min(lists, key=len):
+            if i >= limit: break
+            if key_search in self.keys[i]: return i
+        return limit
+
+    def match_id(self, key_search):
+        """Id Key DB yang cocok (urutan tabel), atau -1 jika tidak ada"""
+        if key_search in self.key_id: return self.key_id[key_search]
+        found = self._first_containing(key_search, self._first_contained(key_search))
+        return found if found < len(self.keys) else -1
+
+    def match_key(self, key_search):
+        """Key DB yang cocok, atau None jika tidak ada"""
+        i = self.match_id(key_search)
+        return self.keys[i] if i >= 0 else None
+
+    def lookup(self, key_search):
+        """(Harga_Dasar, Satuan, Kategori) untuk key_search"""
+        i = self.match_id(key_search)
+        return self.payload[i] if i >= 0 else self.NOT_FOUND
+
+# Tahap fuzzy opsional (rapidfuzz; skor sama dengan thefuzz token_set_ratio yang memakainya)
+try:
+    from rapidfuzz import fuzz, process as fuzz_process
+except ImportError:
+    fuzz = fuzz_process = None
+
+FUZZY_MIN_SCORE = 85  # di bawah ini dianggap tidak cocok
+_FUZZY_JUNK = re.compile(r'[^0-9a-z]+')
+_FUZZY_SPLIT = re.compile(r'(?<=\d)(?=[a-z])|(?<=[a-z])(?=\d)')
+
+def fuzzy_key(text):
+    """Key untuk fuzzy: tanpa tanda baca & angka dipisah dari satuan ("40kg" -> "40 kg")"""
+    return ' '.join(_FUZZY_SPLIT.sub(' ', _FUZZY_JUNK.sub(' ', text)).split())
+
+def fuzzy_numbers(fk):
+    """Token angka sebuah fuzzy_key (ukuran / tipe: "besi beton d 13" -> ('13',))"""
+    return tuple(sorted({t for t in fk.split() if t.isdigit()}))
+
+class FuzzyMatcher:
+    """
+    Tahap fuzzy setelah exact & substring gagal (token_set_ratio, dibulatkan seperti thefuzz).
+    Kandidat diblok per token (token paling jarang dulu, maksimal max_candidates);
+    jika tidak ada token yang sama, pakai bucket huruf pertama. Tidak pernah
+    menilai semua pasangan. Skor dihitung langsung di rapidfuzz (C) per blok kandidat.
+    Kandidat harus punya token angka yang persis sama ("d10" tidak pernah cocok ke "d13"):
+    index token & huruf dikelompokkan per himpunan angka.
+    """
+    def __init__(self, keys, min_score=FUZZY_MIN_SCORE, max_candidates=500):
+        self.keys = list(keys)
+        self.min_score, self.max_candidates = min_score, max_candidates
+        self.fkeys = [fuzzy_key(k) for k in self.keys]
+        self.tokens, self.letters = {}, {}
+        for i, fk in enumerate(self.fkeys):
+            if not fk: continue
+            nums = fuzzy_numbers(fk)
+            for t in set(fk.split()):
+                self.tokens.setdefault((nums, t), []).append(i)
+            self.letters.setdefault((nums, fk[0]), []).append(i)
+
+    def candidates(self, fq):
+        """Id kandidat (urut tabel) dengan token angka yang sama & berbagi token / huruf pertama dengan fq"""
+        nums = fuzzy_numbers(fq)
+        lists = sorted((self.tokens[nums, t] for t in set(fq.split()) if (nums, t) in self.tokens), key=len)
+        ids = set()
+        for ids_t in lists:
+            ids.update(ids_t[:self.max_candidates - len(ids)])
+            if len(ids) >= self.max_candidates: break
+        if not ids: ids = self.letters.get((nums, fq[:1]), [])[:self.max_candidates]
+        return sorted(ids)
+
+    def revise(self, previous, cached):
+        """
+        Perbarui hasil fuzzy lama setelah key berubah tanpa menilai ulang seluruh blok.
+        previous: FuzzyMatcher lama; cached: {key cari: (Key DB atau None, skor)} hasil previous.
+        Return (hasil yang tetap / sudah diperbarui, query yang harus dinilai penuh).
+        Hasil lama tetap berlaku jika pemenangnya masih kandidat & urutan kandidat lama tidak berubah;
+        kandidat baru saja yang dinilai. Skor bulat sama dengan pemenang (seri) -> nilai penuh.
+        """
+        out, redo = {}, []
+        for q, (best, score) in cached.items():
+            fq = fuzzy_key(q)
+            if not fq: out[q] = (None, 0); continue
+            old = [previous.keys[i] for i in previous.candidates(fq)]
+            new = [self.keys[i] for i in self.candidates(fq)]
+            if old == new: out[q] = (best, score); continue
+            old_set, new_set = set(old), set(new)
+            if [k for k in old if k in new_set] != [k for k in new if k in old_set] \
+                    or (best is None and len(new_set & old_set) < len(old)) \
+                    or (best is not None and best not in new_set):
+                redo.append(q); continue
+            top = top_key = None
+            for k in new:
+                if k in old_set: continue
+                s = fuzz.token_set_ratio(fq, fuzzy_key(k))
+                if top is None or s > top: top, top_key = s, k
+            if top is None or int(round(top)) < score:
+                out[q] = (best, score)
+            elif int(round(top)) == score:
+                redo.append(q)
+            else:
+                score = int(round(top))
+                out[q] = (top_key if score >= self.min_score else None, score)
+        return out, redo
+
+    def _result(self, cand, s):
+        """(Key DB atau None, skor dibulatkan seperti thefuzz); skor maksimum pertama = kandidat terdepan"""
+        j = int(np.argmax(s))
+        score = int(round(s[j]))
+        return self.keys[cand[j]] if score >= self.min_score else None, score
+
+    def match_batch(self, queries):
+        """
+        {key cari: (Key DB atau None, skor terbaik 0-100)}.
+        Query dikelompokkan per blok kandidat: satu panggilan rapidfuzz per blok
+        (cdist untuk beberapa query sekaligus, extractOne untuk satu query).
+        """
+        out, blocks = {}, {}
+        for q in queries:
+            fq = fuzzy_key(q)
+            cand = self.candidates(fq) if fq else []
+            if cand: blocks.setdefault(tuple(cand), []).append((q, fq))
+            else: out[q] = (None, 0)
+        for cand, items in blocks.items():
+            choices = [self.fkeys[i] for i in cand]
+            if len(items) == 1:
+                q, fq = items[0]
+                _, score, j = fuzz_process.extractOne(fq, choices, scorer=fuzz.token_set_ratio)
+                score = int(round(score))
+                out[q] = (self.keys[cand[j]] if score >= self.min_score else None, score)
+                continue
+            scores = fuzz_process.cdist([fq for _, fq in items], choices, scorer=fuzz.token_set_ratio, dtype=np.float64, workers=-1)
+            for (q, _), row in zip(items, scores):
+                out[q] = self._result(cand, row)
+        return out
+
+class AnalysisIndex:
+    """
+    Index Kode_Analisa -> posisi baris komponen di df_analysis_detailed,
+    tabel header ternormalisasi (Uraian_Pekerjaan, Divisi_Ref per kode) &
+    Subtotal (sebelum overhead). Lookup O(1) tanpa scan tabel.
+    Posisi tetap valid selama baris df_analysis_detailed tidak berubah
+    (update harga hanya mengubah nilai kolom, bukan susunan baris).
+    """
+    def __init__(self, det):
+        self.det = det
+        self.positions = det.groupby('Kode_Analisa', sort=False, observed=True).indices
+        self.codes = np.array(list(self.positions), dtype=object)  # urutan kemunculan
+        self.first = np.array([pos[0] for pos in self.positions.values()], dtype=np.int64)
+        self.headers = analysis_headers(det.iloc[self.first])
+        self.uraian = dict(zip(self.codes, self.headers['Uraian_Pekerjaan'])) if len(self.first) else {}
+        self.subtotals = pd.Series(dtype=float)
+
+    def __contains__(self, code):
+        return code in self.positions
+
+    def __len__(self):
+        return len(self.codes)
+
+    def part(self, code):
+        """Baris komponen untuk satu Kode_Analisa"""
+        pos = self.positions.get(code)
+        return self.det.iloc[pos] if pos is not None else self.det.iloc[0:0]
+
+    def rows_of(self, codes):
+        """Posisi baris gabungan untuk beberapa Kode_Analisa (urut naik)"""
+        pos = [self.positions[c] for c in codes if c in self.positions]
+        return np.sort(np.concatenate(pos)) if pos else np.array([], dtype=np.int64)
+
+    def first_rows(self):
+        """Baris pertama per Kode_Analisa (setara drop_duplicates(subset=['Kode_Analisa']))"""
+        return self.det.iloc[self.first]
+
+    def subtotal(self, code):
+        return self.subtotals.get(code, 0.0)
+
+class IncrementalCalculator:
+    """
+    Mesin hitung inkremental (satu per sesi, disimpan di session_state).
+    Menyimpan hasil terakhir & hanya menghitung ulang bagian yang berubah:
+    - Nilai harga berubah      -> baris analisa yang memakai Key tsb
+    - Key harga ditambah       -> re-match Key_Raw yang belum ketemu / sama persis
+    - Key dihapus / urutan ubah -> bangun ulang index & re-match semua
+    - Baris analisa berubah    -> Kode_Analisa terkait
+    - Baris RAB berubah        -> baris RAB tsb & grup material terkait
+    - Overhead berubah         -> hanya skala ulang harga satuan (tanpa re-match)
+    fork() membuat salinan murah yang berbagi struktur read-only (mis. dari master bersama).
+    """
+    ANALYSIS_COLS = ['Kode_Analisa', 'Uraian_Pekerjaan', 'Komponen', 'Koefisien', 'Divisi_Ref']
+    PRICE_DET_COLS = ['Harga_Dasar', 'Satuan', 'Kategori', 'Subtotal']
+
+    def __init__(self, fuzzy_min_score=FUZZY_MIN_SCORE):
+        self.fuzzy_min_score = fuzzy_min_score if fuzz is not None else None  # None = tanpa fuzzy
+        self.keys = None          # urutan Key harga terakhir
+        self.payload = {}         # Key -> (Harga_Dasar, Satuan, Kategori)
+        self.p_src = None         # objek df_prices terakhir (objek sama = isi sama, normalisasi dilewati)
+        self.matcher = None
+        self.fuzzy = None
+        self.match = {}           # Key_Raw -> Key DB (None = tidak ketemu)
+        self.match_info = {}      # Key_Raw -> (metode 'exact'/'partial'/'fuzzy'/None, skor)
+        self.a_hash = None        # hash per baris df_analysis
+        self.a_src = None         # objek df_analysis terakhir (objek sama = isi sama, hash dilewati)
+        self.det = None           # df_analysis_detailed
+        self.det_shared = False   # True: kolom det masih milik calculator lain (salin sebelum ditulis)
+        self.index = None         # AnalysisIndex atas self.det
+        self.code_sub = pd.Series(dtype=float)  # Kode_Analisa -> jumlah Subtotal
+        self.code_comp = None     # kebutuhan per 1 volume: Kode x (Komponen, Satuan)
+        self.factor = None
+        self.r_hash = None        # hash per baris RAB (Kode_Analisa_Ref, Volume)
+        self.hsj = None           # Harga_Satuan_Jadi per baris RAB
+        self.code_vol = pd.Series(dtype=float)  # Kode RAB -> total volume
+        self.mat = None           # rekap material (index Komponen, Satuan)
+        self.updated = set()      # tabel hasil yang berubah pada recalc terakhir
+        self.profiler = NULL_PROFILER
+
+    def fork(self):
+        """
+        Salinan untuk sesi lain. Index harga, matcher & kolom det dibagi (read-only);
+        kolom harga det baru disalin saat sesi ini pertama kali menulisnya (copy-on-write).
+        """
+        other = copy.copy(self)
+        other.payload, other.match, other.match_info = dict(self.payload), dict(self.match), dict(self.match_info)
+        other.updated = set()
+        if self.det is not None:
+            other.det = self.det.copy(deep=False)
+            other.index = copy.copy(self.index)
+            other.index.det = other.det
+            other.det_shared = True
+        return other
+
+    def _own_det(self):
+        """Salin kolom harga det yang masih dibagi sebelum ditulis di tempat"""
+        if not self.det_shared: return
+        for c in self.PRICE_DET_COLS:
+            self.det[c] = self.det[c].copy()
+        self.det_shared = False
+
+    def snapshot(self):
+        """State yang mahal dihitung ulang: analisa detail & hasil pencocokan Key_Raw -> Key (untuk disimpan)"""
+        q = list(self.match)
+        info = [self.match_info.get(k, (None, 0)) for k in q]
+        matches = pd.DataFrame({'Key_Raw': pd.Series(q, dtype=object), 'Key': pd.Series([self.match[k] for k in q], dtype=object),
+                                'Metode': pd.Series([m for m, _ in info], dtype=object),
+                                'Skor': np.array([s for _, s in info], dtype=np.int32)})
+        return self.det, matches
+
+    def restore(self, df_prices, df_analysis, det, matches):
+        """
+        Pulihkan state dari snapshot() tanpa mencocokkan ulang harga & tanpa menghitung analisa.
+        Return False (state tidak diubah) jika snapshot tidak sesuai dengan df_analysis.
+        """
+        if self.det is not None or len(det) != len(df_analysis): return False
+        self.payload, self.p_src = self._price_payload(df_prices), df_prices
+        self.keys = list(self.payload)  # index harga dibangun saat pertama kali ada Key_Raw baru (_resolve)
+        keys = matches['Key'].astype(object).where(matches['Key'].notna(), None)
+        metode = matches['Metode'].astype(object).where(matches['Metode'].notna(), None)
+        self.match = dict(zip(matches['Key_Raw'], keys))
+        self.match_info = {q: (m, int(s)) for q, m, s in zip(matches['Key_Raw'], metode, matches['Skor'])}
+        # Kolom det bisa menunjuk memory map read-only -> salin saat pertama kali ditulis
+        self.det, self.det_shared = apply_schema(det, 'analysis_detailed'), True
+        self.a_hash, self.a_src = self._row_hash(df_analysis, self.ANALYSIS_COLS), df_analysis
+        self.index = AnalysisIndex(self.det)
+        self._sync_codes(None)
+        return True
+
+    @staticmethod
+    def _same(a, b):
+        return a == b or all(x == y or (pd.isna(x) and pd.isna(y)) for x, y in zip(a, b))
+
+    @staticmethod
+    def _row_hash(df, cols):
+        return pd.util.hash_pandas_object(df[cols], index=False).to_numpy()
+
+    # --- A. Harga: tentukan Key_Raw yang perlu dihitung ulang ---
+    def _price_payload(self, df_p):
+        with self.profiler.stage('normalize_keys', rows=len(df_p)):
+            keys = df_p['Komponen'].apply(normalize_text)
+            payload = {}
+            for k, p, s, c in zip(keys, df_p['Harga_Dasar'], df_p['Satuan'], df_p['Kategori']):
+                payload[k] = (p, s, c)
+        return payload
+
+    def _build_matchers(self, order, payload):
+        with self.profiler.stage('build_price_index', rows=len(order)):
+            self.matcher = PriceMatcher(order, *zip(*payload.values())) if order else PriceMatcher([], [], [], [])
+            if self.fuzzy_min_score is not None: self.fuzzy = FuzzyMatcher(order, self.fuzzy_min_score)
+
+    def _sync_prices(self, df_p):
+        if df_p is self.p_src and self.keys is not None: return set()
+        payload = self._price_payload(df_p)
+        order = list(payload)
+        if order == self.keys:
+            changed = {k for k, v in payload.items() if not self._same(v, self.payload[k])}
+            rematch, previous = set(), None
+        else:
+            previous = self.fuzzy
+            self._build_matchers(order, payload)
+            changed = {k for k, v in payload.items() if k in self.payload and not self._same(v, self.payload[k])}
+            if self.keys is not None and order[:len(self.keys)] == self.keys:
+                # Key baru di belakang hanya menang atas yang belum ketemu, fuzzy, / sama persis
+                added = set(order[len(self.keys):])
+                rematch = {q for q, k in self.match.items() if k is None or q in added or self.match_info[q][0] == 'fuzzy'}
+            else:
+                # Key dihapus / diurutkan ulang: hasil fuzzy lama diperbarui (revise), bukan dinilai ulang semua
+                rematch = set(self.match)
+        self.keys, self.payload, self.p_src = order, payload, df_p
+
+        dirty = set()
+        with self.profiler.stage('match_prices', rows=len(rematch)):
+            resolved = self._resolve(list(rematch), previous)
+        for q, k in resolved.items():
+            if k != self.match[q]: dirty.add(q)
+            self.match[q] = k
+        if changed:
+            dirty.update(q for q, k in self.match.items() if k in changed)
+        return dirty
+
+    def _resolve(self, queries, previous=None):
+        """
+        Cocokkan Key_Raw: exact -> substring (PriceMatcher) -> fuzzy (batch). Return {q: Key DB / None}
+        previous: FuzzyMatcher sebelum key berubah; hasil fuzzy lama diperbarui lewat FuzzyMatcher.revise.
+        """
+        out, pending = {}, []
+        if queries and self.matcher is None: self._build_matchers(self.keys, self.payload)
+        for q in queries:
+            k = self.matcher.match_key(q)
+            if k is None: pending.append(q); continue
+            out[q] = k
+            self.match_info[q] = ('exact' if k == q else 'partial', 100)
+        kept = {}
+        if pending and previous is not None and self.fuzzy is not None:
+            cached = {q: (self.match.get(q), self.match_info[q][1]) for q in pending if self.match_info.get(q, ('exact',))[0] in ('fuzzy', None)}
+            kept, redo = self.fuzzy.revise(previous, cached)
+            pending = [q for q in pending if q not in cached] + redo
+        fuzzy = self.fuzzy.match_batch(pending) if pending and self.fuzzy is not None else {q: (None, 0) for q in pending}
+        fuzzy.update(kept)
+        for q, (k, score) in fuzzy.items():
+            out[q] = k
+            self.match_info[q] = ('fuzzy' if k is not None else None, score)
+        return out
+
+    def match_report(self):
+        """Kualitas pencocokan per Komponen unik di analisa: Metode, Skor, Cocok_Dengan, Jumlah_Baris"""
+        if self.det is None or self.det.empty:
+            return pd.DataFrame(columns=['Komponen', 'Metode', 'Skor', 'Cocok_Dengan', 'Jumlah_Baris'])
+        counts = self.det.groupby('Key_Raw', sort=False, observed=True).agg(Komponen=('Komponen', 'first'), Jumlah_Baris=('Komponen', 'size'))
+        info = [self.match_info.get(q, (None, 0)) for q in counts.index]
+        return pd.DataFrame({
+            'Komponen': counts['Komponen'].to_numpy(),
+            'Metode': [m or 'tidak ketemu' for m, _ in info],
+            'Skor': [sc for _, sc in info],
+            'Cocok_Dengan': [self.match.get(q) or '-' for q in counts.index],
+            'Jumlah_Baris': counts['Jumlah_Baris'].to_numpy()
+        })
+
+    def _price_cols(self, key_raw):
+        """Harga_Dasar, Satuan, Kategori untuk Series Key_Raw (dihitung per Key unik lalu disebar via kode kategori)"""
+        keys = key_raw.cat.remove_unused_categories() if is_category(key_raw) else key_raw.astype('category')
+        uniq = list(keys.cat.categories)
+        self.match.update(self._resolve([q for q in uniq if q not in self.match]))
+        res = [self.payload[self.match[q]] if self.match[q] is not None else PriceMatcher.NOT_FOUND for q in uniq]
+        codes = keys.cat.codes.to_numpy()
+        cols = [np.array([v[i] for v in res] + [None], dtype=object)[codes] for i in range(3)]  # kode -1 -> None
+        return (pd.Series(pd.to_numeric(cols[0], errors='coerce'), index=key_raw.index, dtype=float),
+                pd.Series(pd.Categorical(cols[1]), index=key_raw.index),
+                pd.Series(pd.Categorical(cols[2]), index=key_raw.index))
+
+    # --- B. Analisa: terapkan harga & cari Kode_Analisa terdampak ---
+    def _sync_analysis(self, df_a, dirty):
+        a_hash = self.a_hash if df_a is self.a_src and self.det is not None else self._row_hash(df_a, self.ANALYSIS_COLS)
+        self.a_src = df_a
+        if self.det is None or len(a_hash) != len(self.a_hash) or (a_hash != self.a_hash).any():
+            det = apply_schema(df_a, 'analysis').copy()
+            with self.profiler.stage('normalize_keys', rows=len(det)):
+                det['Key_Raw'] = map_categories(det['Komponen'], normalize_text)
+            with self.profiler.stage('match_prices', rows=len(det)):
+                det['Harga_Dasar'], det['Satuan'], det['Kategori'] = self._price_cols(det['Key_Raw'])
+            det['Subtotal'] = det['Koefisien'] * det['Harga_Dasar']
+            det = apply_schema(det, 'analysis_detailed')
+            if self.det is None:
+                affected = None
+            else:
+                # Bandingkan jumlah tiap hash (multiset): baris duplikat yang ditambah / dihapus ikut terhitung
+                counts = pd.Series(a_hash).value_counts().sub(pd.Series(self.a_hash).value_counts(), fill_value=0)
+                changed = counts.index[counts != 0]
+                new_rows = pd.Series(a_hash).isin(changed).to_numpy()
+                old_rows = pd.Series(self.a_hash).isin(changed).to_numpy()
+                affected = set(det.loc[new_rows, 'Kode_Analisa']) | set(self.det.loc[old_rows, 'Kode_Analisa'])
+                affected |= set(det.loc[det['Key_Raw'].isin(dirty), 'Kode_Analisa'])
+            self.det, self.a_hash, self.det_shared = det, a_hash, False
+            self.index = AnalysisIndex(det)
+            self.updated.add('df_analysis_detailed')
+            return affected
+        det = self.det
+        rows = det['Key_Raw'].isin(dirty).to_numpy()
+        if not rows.any(): return set()
+        h, s, c = self._price_cols(det.loc[rows, 'Key_Raw'])
+        self._own_det()
+        det.loc[rows, 'Harga_Dasar'] = h
+        assign_rows(det, rows, 'Satuan', s.astype(object).to_numpy())
+        assign_rows(det, rows, 'Kategori', c.astype(object).to_numpy())
+        det.loc[rows, 'Subtotal'] = det.loc[rows, 'Koefisien'] * det.loc[rows, 'Harga_Dasar']
+        self.updated.add('df_analysis_detailed')
+        return set(det.loc[rows, 'Kode_Analisa'])
+
+    # --- C. Agregat per Kode_Analisa (Subtotal & kebutuhan material per volume) ---
+    def _sync_codes(self, affected):
+        det = self.det
+        part = det if affected is None else det.iloc[self.index.rows_of(affected)]
+        sub = part.groupby(plain(part['Kode_Analisa']))['Subtotal'].sum()
+        comp = pd.DataFrame({
+            'Kode_Analisa': part['Kode_Analisa'], 'Komponen': part['Komponen'], 'Satuan': part['Satuan'],
+            'Koefisien': part['Koefisien'], 'Biaya': part['Koefisien'] * part['Harga_Dasar']
+        }).groupby(['Kode_Analisa', 'Komponen', 'Satuan'], as_index=False, observed=True)[['Koefisien', 'Biaya']].sum()
+        if affected is None:
+            self.code_sub, self.code_comp = sub, comp
+            self.index.subtotals = sub
+            return None
+        old_comp = self.code_comp[self.code_comp['Kode_Analisa'].isin(affected)]
+        self.code_sub = pd.concat([self.code_sub.drop(list(affected), errors='ignore'), sub]).sort_index()
+        self.index.subtotals = self.code_sub
+        self.code_comp = pd.concat([self.code_comp[~self.code_comp['Kode_Analisa'].isin(affected)], comp], ignore_index=True)
+        return set(zip(old_comp['Komponen'], old_comp['Satuan'])) | set(zip(comp['Komponen'], comp['Satuan']))
+
+    # --- D. RAB: Harga_Satuan_Jadi & Total_Harga per baris ---
+    def _sync_rab(self, df_r, affected, factor):
+        df_r['Kode_Analisa_Ref'] = df_r['Kode_Analisa_Ref'].astype(str).str.strip()
+        r_hash = self._row_hash(df_r, ['Kode_Analisa_Ref', 'Volume'])
+        n = len(df_r)
+        if self.hsj is None or factor != self.factor or affected is None:
+            rows = np.ones(n, dtype=bool)
+            hsj, total = np.zeros(n), np.zeros(n, dtype=object)
+        else:
+            m = min(n, len(self.r_hash))
+            rows = np.ones(n, dtype=bool)
+            rows[:m] = r_hash[:m] != self.r_hash[:m]
+            rows |= df_r['Kode_Analisa_Ref'].isin(affected).to_numpy()
+            hsj = np.zeros(n); hsj[:m] = self.hsj[:m]
+            total = np.zeros(n, dtype=object); total[:m] = self.total[:m]
+        if rows.any() or self.r_hash is None or len(r_hash) != len(self.r_hash):
+            self.updated.add('df_rab')
+        if rows.any():
+            unit = self.code_sub * factor
+            unit.index = unit.index.astype(str).str.strip()
+            unit = unit[~unit.index.duplicated()]
+            ref = df_r['Kode_Analisa_Ref'].to_numpy()[rows]
+            hsj[rows] = pd.Series(ref).map(unit).fillna(0).to_numpy(dtype=float)
+            total[rows] = (df_r['Volume'].iloc[rows] * hsj[rows]).to_numpy()
+        df_r['Harga_Satuan_Jadi'] = hsj
+        df_r['Total_Harga'] = pd.Series(total, index=df_r.index).infer_objects()
+        self.r_hash, self.hsj, self.total, self.factor = r_hash, hsj, total, factor
+        return df_r
+
+    # --- E. Rekap Material: hanya grup (Komponen, Satuan) yang terdampak ---
+    def _sync_material(self, df_r, comp_groups):
+        vol = pd.to_numeric(df_r['Volume'], errors='coerce').groupby(df_r['Kode_Analisa_Ref']).sum()
+        union = self.code_vol.index.union(vol.index)
+        a, b = self.code_vol.reindex(union), vol.reindex(union)
+        vol_codes = set(union[~((a == b) | (a.isna() & b.isna()))])
+        self.code_vol = vol
+        cc = self.code_comp
+        if self.mat is None or comp_groups is None:
+            groups = None
+        else:
+            groups = set(comp_groups or ())
+            if vol_codes:
+                hit = cc[cc['Kode_Analisa'].isin(vol_codes)]
+                groups |= set(zip(hit['Komponen'], hit['Satuan']))
+            if not groups: return None
+            pairs = pd.MultiIndex.from_frame(cc[['Komponen', 'Satuan']])
+            cc = cc[pairs.isin(list(groups))]
+        cc = cc[cc['Kode_Analisa'].isin(vol.index)]
+        v = plain(cc['Kode_Analisa']).map(vol)
+        agg = pd.DataFrame({
+            'Komponen': cc['Komponen'], 'Satuan': cc['Satuan'],
+            'Total_Kebutuhan': v * cc['Koefisien'], 'Total_Biaya': v * cc['Biaya']
+        }).groupby(['Komponen', 'Satuan'], observed=True).agg({'Total_Kebutuhan': 'sum', 'Total_Biaya': 'sum'})
+        if groups is None:
+            self.mat = agg
+        else:
+            keep = ~self.mat.index.isin(list(groups))
+            self.mat = pd.concat([self.mat[keep], agg]).sort_index()
+        self.updated.add('df_material_rekap')
+        return self.mat.reset_index()
+
+    def recalc(self, df_prices, df_analysis, df_rab, overhead_pct):
+        """
+        Hitung ulang inkremental -> (df_analysis_detailed, df_rab, df_material_rekap).
+        self.updated berisi nama tabel hasil yang benar-benar berubah.
+        """
+        factor = 1 + (overhead_pct / 100)
+        self.updated = set()
+        prof = self.profiler
+        with prof.stage('prices', rows=len(df_prices)):
+            dirty = self._sync_prices(df_prices)
+        with prof.stage('analysis', rows=len(df_analysis)):
+            affected = self._sync_analysis(df_analysis, dirty)
+        with prof.stage('aggregate_codes') as stage:
+            comp_groups = self._sync_codes(affected) if affected is None or affected else set()
+            stage.rows = len(self.code_sub)
+        with prof.stage('merge_rab', rows=len(df_rab)):
+            df_r = self._sync_rab(df_rab.copy(), affected, factor)
+        with prof.stage('merge_material') as stage:
+            mat = self._sync_material(df_r, comp_groups)
+            stage.rows = len(mat) if mat is not None else 0
+        return self.det, df_r, mat
@@ -0,0 +1,91 @@
+"""
+CLI batch: hitung satu atau banyak varian RAB dari satu direktori CSV master.
+
+    python -m smartrab.cli DATA_DIR RAB.csv [RAB2.xlsx ...] -o OUTPUT [--jobs N]
+
+Data master (harga & analisa) di-parse sekali. Varian RAB lalu dihitung di
+process pool: setiap worker menerima master sekali lewat initializer, lalu
+memakai ulang mesin inkremental sehingga tiap varian hanya menghitung baris RAB.
+"""
+import argparse
+import multiprocessing as mp
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from smartrab.engine import CostingEngine, DEFAULT_OVERHEAD, read_rab
+from smartrab.parse_cache import ParseCache
+
+_worker_engine = None
+
+def _init_worker(prices, analysis, overhead, project):
+    global _worker_engine
+    _worker_engine = CostingEngine(prices, analysis, overhead=overhead, project=project)
+
+def _cost_variant(rab_path, out_path):
+    """Worker: hitung satu file RAB & tulis workbook. Return: (rab_path, out_path, grand total)"""
+    engine = _worker_engine
+    engine.set_rab(read_rab(rab_path))
+    engine.calculate()
+    engine.write_workbook(out_path)
+    return rab_path, out_path, engine.grand_total()
+
+def output_paths(rab_paths, output):
+    """OUTPUT .xlsx untuk satu RAB, selain itu direktori berisi <nama RAB>.xlsx"""
+    if len(rab_paths) == 1 and output.lower().endswith('.xlsx'): return [output]
+    os.makedirs(output, exist_ok=True)
+    return [os.path.join(output, os.path.splitext(os.path.basename(p))[0] + '.xlsx') for p in rab_paths]
+
+def run(data_dir, rab_paths, output, overhead=DEFAULT_OVERHEAD, jobs=None, use_cache=True, project=None, log=print):
+    """Parse master sekali, hitung semua varian RAB. Return: daftar (rab_path, out_path, grand total)"""
+    t0 = time.perf_counter()
+    cache = None
+    if use_cache:
+        try: cache = ParseCache()
+        except OSError: cache = None
+    master = CostingEngine(overhead=overhead, project=project)
+    for msg in master.load_dir(data_dir, parallel=jobs != 1, max_workers=jobs, cache=cache):
+        log(msg)
+    log(f"Master: {len(master.prices)} harga, {len(master.analysis)} baris analisa ({time.perf_counter() - t0:.1f} dtk)")
+
+    outs = output_paths(rab_paths, output)
+    workers = min(jobs or os.cpu_count() or 1, len(rab_paths))
+    initargs = (master.prices, master.analysis, overhead, project)
+    results = []
+    if workers > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context('spawn'),
+                                     initializer=_init_worker, initargs=initargs) as pool:
+                futures = [pool.submit(_cost_variant, r, o) for r, o in zip(rab_paths, outs)]
+                for fut in as_completed(futures):
+                    results.append(fut.result())
+                    log(f"✅ {results[-1][1]}: Rp {results[-1][2]:,.0f}")
+            return results
+        except OSError:
+            pass  # Pool tidak bisa dibuat -> lanjut berurutan
+    _init_worker(*initargs)
+    for r, o in zip(rab_paths, outs):
+        results.append(_cost_variant(r, o))
+        log(f"✅ {o}: Rp {results[-1][2]:,.0f}")
+    return results
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog='python -m smartrab.cli', description="Hitung RAB dari CSV master tanpa Streamlit.")
+    ap.add_argument('data_dir', help="Direktori CSV master (Upah Bahan + Divisi)")
+    ap.add_argument('rab', nargs='+', help="File RAB (.csv / .xlsx), satu per varian proyek")
+    ap.add_argument('-o', '--output', required=True, help="File .xlsx (satu RAB) atau direktori output")
+    ap.add_argument('--overhead', type=float, default=DEFAULT_OVERHEAD, help="Overhead %% (default 15)")
+    ap.add_argument('-j', '--jobs', type=int, default=None, help="Jumlah proses (default semua core)")
+    ap.add_argument('--no-cache', action='store_true', help="Jangan pakai cache parse di disk")
+    ap.add_argument('--project-name', default='')
+    ap.add_argument('--project-loc', default='')
+    ap.add_argument('--project-year', default='')
+    args = ap.parse_args(argv)
+    project = {'project_name': args.project_name, 'project_loc': args.project_loc, 'project_year': args.project_year}
+    run(args.data_dir, args.rab, args.output, overhead=args.overhead, jobs=args.jobs,
+        use_cache=not args.no_cache, project=project)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
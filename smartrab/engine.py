@@ -0,0 +1,152 @@
+"""
+Engine costing tanpa Streamlit: memegang tabel harga, analisa & RAB beserta
+hasil hitungnya. Dipakai oleh CLI batch (smartrab.cli) dan oleh app.py
+(penggabungan hasil upload & struktur tabel default).
+"""
+import os
+
+import pandas as pd
+
+from smartrab.calc import IncrementalCalculator
+from smartrab.export import write_tender_package, tender_package_bytes
+from smartrab.parser import NamedBytesIO, parse_files
+from smartrab.project import ProjectBundle, write_project
+from smartrab.scenario import category_costs, run_scenarios
+from smartrab.schema import SCHEMAS, apply_schema, empty_table
+
+PRICE_COLS = list(SCHEMAS['prices'])
+ANALYSIS_COLS = list(SCHEMAS['analysis'])
+RAB_COLS = list(SCHEMAS['rab'])
+DEFAULT_OVERHEAD = 15.0
+RAB_DEFAULTS = {'Volume': 0.0, 'Harga_Satuan_Jadi': 0, 'Total_Harga': 0, 'Durasi_Minggu': 1, 'Minggu_Mulai': 1}
+
+def ensure_rab_columns(df_rab):
+    """Lengkapi kolom jadwal & referensi yang belum ada. Return: True jika tabel diubah"""
+    changed = False
+    for c in ('Durasi_Minggu', 'Minggu_Mulai', 'Kode_Analisa_Ref'):
+        if c not in df_rab.columns:
+            df_rab[c] = 1 if c != 'Kode_Analisa_Ref' else ''
+            changed = True
+    return changed
+
+def merge_parse_results(df_prices, df_analysis, results):
+    """
+    Gabungkan hasil parse_files (urut upload) ke tabel harga & analisa.
+    Harga: Komponen terakhir menang. Analisa: duplikat (Kode_Analisa, Komponen) dibuang.
+    Return: (df_prices, df_analysis, pesan log); tabel yang tidak berubah dikembalikan apa adanya.
+    """
+    msgs, new_prices, new_analyses = [], [], []
+    for kind, rows, msg in results:
+        if kind == 'harga' and len(rows):
+            new_prices.append(rows)
+        elif kind == 'analisa' and len(rows):
+            new_analyses.append(rows)
+        if msg: msgs.append(msg)
+    if new_prices:
+        df_all = pd.concat([df_prices] + new_prices)
+        df_prices = apply_schema(df_all.drop_duplicates(subset=['Komponen'], keep='last'), 'prices')
+    if new_analyses:
+        # Tabel kosong tidak ikut concat: kolom kategori kosong + teks membuat semua kolom jadi object
+        # (drop_duplicates & kategorisasi jauh lebih lambat daripada atas kolom string Arrow)
+        df_all = pd.concat(([df_analysis] if len(df_analysis) else []) + new_analyses, ignore_index=True)
+        df_analysis = apply_schema(df_all.drop_duplicates(subset=['Kode_Analisa', 'Komponen']), 'analysis')
+    return df_prices, df_analysis, msgs
+
+def csv_files(directory):
+    """Semua *.csv di direktori (urut nama) sebagai file upload bernama"""
+    names = sorted(fn for fn in os.listdir(directory) if fn.lower().endswith('.csv'))
+    files = []
+    for fn in names:
+        with open(os.path.join(directory, fn), 'rb') as fh:
+            files.append(NamedBytesIO(fn, fh.read()))
+    return files
+
+def read_rab(path):
+    """Baca tabel RAB dari .csv / .xlsx (kolom seperti tab RAB; kolom yang hilang diisi default)"""
+    if path.lower().endswith(('.xlsx', '.xls')): df = pd.read_excel(path)
+    else: df = pd.read_csv(path)
+    for c in RAB_COLS:
+        if c in df.columns: continue
+        df[c] = range(1, len(df) + 1) if c == 'No' else RAB_DEFAULTS.get(c, '')
+    return apply_schema(df, 'rab')
+
+class CostingEngine:
+    """
+    Satu proyek: tabel sumber (prices, analysis, rab) + hasil hitung
+    (analysis_detailed, rab_result, material). Mesin inkremental dipakai ulang,
+    jadi mengganti RAB saja (varian proyek) hanya menghitung ulang baris RAB.
+    """
+    def __init__(self, prices=None, analysis=None, rab=None, overhead=DEFAULT_OVERHEAD, project=None):
+        self.prices = apply_schema(prices, 'prices') if prices is not None else empty_table('prices')
+        self.analysis = apply_schema(analysis, 'analysis') if analysis is not None else empty_table('analysis')
+        self.rab = apply_schema(rab, 'rab') if rab is not None else empty_table('rab')
+        self.overhead = overhead
+        self.project = dict(project or {})
+        self.calculator = IncrementalCalculator()
+        self.analysis_detailed = self.rab_result = self.material = None
+
+    def load_files(self, files, **kwargs):
+        """Parse & gabungkan file upload (argumen lain diteruskan ke parse_files). Return: pesan log"""
+        results = parse_files(files, **kwargs)
+        self.prices, self.analysis, msgs = merge_parse_results(self.prices, self.analysis, results)
+        self.rab_result = None
+        return msgs
+
+    @classmethod
+    def open_project(cls, source):
+        """Engine dari file proyek .srab (path di-memory-map, atau bytes); hasil hitung dipulihkan tanpa re-match"""
+        bundle = source if isinstance(source, ProjectBundle) else ProjectBundle(source)
+        meta = bundle.meta
+        project = {k: meta[k] for k in ('project_name', 'project_loc', 'project_year') if k in meta}
+        engine = cls(bundle.table('prices'), bundle.table('analysis'), bundle.table('rab'),
+                     overhead=meta.get('global_overhead', DEFAULT_OVERHEAD), project=project)
+        if 'analysis_detailed' in bundle and 'matches' in bundle:
+            engine.calculator.restore(engine.prices, engine.analysis, bundle.table('analysis_detailed'), bundle.table('matches'))
+        return engine
+
+    def project_tables(self):
+        """Tabel untuk write_project (analisa detail & pencocokan ikut bila sudah dihitung)"""
+        tables = {'prices': self.prices, 'analysis': self.analysis, 'rab': self.rab}
+        if self.calculator.det is not None:
+            tables['analysis_detailed'], tables['matches'] = self.calculator.snapshot()
+        return tables
+
+    def save_project(self, target):
+        """Simpan proyek (.srab) ke path / objek file biner"""
+        write_project(target, self.project_tables(), {**self.project, 'global_overhead': self.overhead})
+
+    def load_dir(self, directory, **kwargs):
+        """load_files untuk semua CSV di satu direktori"""
+        return self.load_files(csv_files(directory), **kwargs)
+
+    def set_rab(self, df_rab):
+        ensure_rab_columns(df_rab)
+        self.rab, self.rab_result = apply_schema(df_rab, 'rab'), None
+
+    def calculate(self):
+        """Hitung analisa detail, RAB & rekap material. Return: self"""
+        det, df_r, mat = self.calculator.recalc(self.prices, self.analysis, self.rab, self.overhead)
+        self.analysis_detailed, self.rab_result = det, df_r
+        if mat is not None: self.material = mat  # None = rekap material tidak berubah
+        return self
+
+    def run_scenarios(self, scenarios):
+        """Bandingkan banyak skenario (lihat smartrab.scenario) memakai hasil pencocokan yang sudah ada"""
+        if self.rab_result is None: self.calculate()
+        return run_scenarios(category_costs(self.analysis_detailed), self.rab, scenarios)
+
+    def _package_args(self):
+        if self.rab_result is None: self.calculate()
+        return (self.rab_result, self.analysis_detailed, self.prices,
+                self.material if self.material is not None else pd.DataFrame(), self.overhead)
+
+    def write_workbook(self, target):
+        """Tulis Paket Tender (.xlsx) ke path / objek file biner"""
+        write_tender_package(target, *self._package_args(), project=self.project, index=self.calculator.index)
+
+    def workbook_bytes(self):
+        return tender_package_bytes(*self._package_args(), project=self.project, index=self.calculator.index)
+
+    def grand_total(self):
+        if self.rab_result is None: self.calculate()
+        return float(pd.to_numeric(self.rab_result['Total_Harga'], errors='coerce').sum())
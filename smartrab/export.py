@@ -0,0 +1,146 @@
+"""
+Export Paket Tender (Excel multi-sheet) secara streaming.
+Workbook ditulis baris demi baris dengan mode constant_memory xlsxwriter:
+setiap baris langsung di-flush ke file sementara, sehingga memori puncak
+tidak bergantung pada jumlah baris. Semua format dibuat sekali di awal.
+Sheet: REKAP, RAB, AHSP, HARGA DASAR, MATERIAL, KURVA-S, CASH FLOW.
+"""
+import io
+
+import pandas as pd
+import xlsxwriter
+
+from smartrab.schedule import s_curve, weekly_plan, division_cashflow
+
+CHUNK_ROWS = 20_000
+PPN_RATE = 0.11
+
+class _Formats:
+    """Format sel yang dipakai ulang di semua sheet (dibuat sekali per workbook)"""
+    def __init__(self, wb):
+        self.title = wb.add_format({'bold': True, 'font_size': 14})
+        self.header = wb.add_format({'bold': True, 'bg_color': '#D9E1F2', 'border': 1})
+        self.bold = wb.add_format({'bold': True})
+        self.money = wb.add_format({'num_format': '#,##0'})
+        self.money_bold = wb.add_format({'num_format': '#,##0', 'bold': True})
+        self.money_total = wb.add_format({'num_format': '#,##0', 'bold': True, 'font_color': 'blue'})
+        self.coef = wb.add_format({'num_format': '0.0000'})
+        self.pct = wb.add_format({'num_format': '0.00'})
+        self.number = wb.add_format({'num_format': '#,##0.00'})
+
+def _write_number(ws, r, c, v, fmt):
+    if v is None or v != v: ws.write_blank(r, c, None, fmt)  # NaN -> kosong
+    else: ws.write_number(r, c, v, fmt)
+
+def _write_text(ws, r, c, v, fmt):
+    if v is None or (isinstance(v, float) and v != v): ws.write_blank(r, c, None, fmt)
+    else: ws.write_string(r, c, str(v), fmt)
+
+def _write_any(ws, r, c, v, fmt):
+    """Kolom object campuran: angka tetap angka, sisanya teks"""
+    if isinstance(v, (int, float)) and not isinstance(v, bool): _write_number(ws, r, c, v, fmt)
+    else: _write_text(ws, r, c, v, fmt)
+
+def _write_table(ws, df, fm, start_row=0, formats=None, widths=None):
+    """
+    Tulis DataFrame (header + isi) per potongan CHUNK_ROWS.
+    formats: {kolom: format}; kolom numerik memakai write_number, kolom object dicek per sel.
+    Return: baris berikutnya yang kosong.
+    """
+    formats = formats or {}
+    cols = list(df.columns)
+    for c, name in enumerate(cols):
+        ws.write_string(start_row, c, str(name), fm.header)
+        if widths: ws.set_column(c, c, widths.get(name, 14))
+    writers, fmts = [], []
+    for name in cols:
+        numeric = pd.api.types.is_numeric_dtype(df[name]) and not pd.api.types.is_bool_dtype(df[name])
+        writers.append(_write_number if numeric else _write_any)
+        fmts.append(formats.get(name, fm.number if numeric else None))
+    r = start_row + 1
+    for a in range(0, len(df), CHUNK_ROWS):
+        chunk = df.iloc[a:a + CHUNK_ROWS]
+        columns = [chunk[name].tolist() for name in cols]  # nilai Python native
+        for row in zip(*columns):
+            for c, v in enumerate(row):
+                writers[c](ws, r, c, v, fmts[c])
+            r += 1
+    return r
+
+def _sheet_rekap(wb, fm, df_rab, project, ppn_rate):
+    ws = wb.add_worksheet('REKAP')
+    ws.set_column(0, 0, 40); ws.set_column(1, 1, 22)
+    ws.write_string(0, 0, 'REKAPITULASI BIAYA', fm.title)
+    r = 1
+    for label, key in (('Proyek', 'project_name'), ('Lokasi', 'project_loc'), ('Tahun', 'project_year')):
+        ws.write_string(r, 0, label, fm.bold); _write_text(ws, r, 1, project.get(key, ''), None); r += 1
+    r += 1
+    rekap = df_rab.groupby('Divisi')['Total_Harga'].sum().reset_index() if not df_rab.empty else pd.DataFrame(columns=['Divisi', 'Total_Harga'])
+    r = _write_table(ws, rekap, fm, r, {'Total_Harga': fm.money})
+    gt = float(pd.to_numeric(rekap['Total_Harga'], errors='coerce').sum())
+    for label, val, f in (('TOTAL FISIK', gt, fm.money_bold), (f'PPN {ppn_rate * 100:g}%', gt * ppn_rate, fm.money),
+                          (f'GRAND TOTAL (+PPN {ppn_rate * 100:g}%)', gt * (1 + ppn_rate), fm.money_total)):
+        ws.write_string(r, 0, label, fm.bold); ws.write_number(r, 1, val, f); r += 1
+
+def _sheet_ahsp(wb, fm, df_det, overhead, index=None):
+    """Satu blok per Kode_Analisa, sama dengan render_sni_html di tab ANALISA"""
+    ws = wb.add_worksheet('AHSP')
+    for c, w in enumerate((45, 12, 10, 16, 18)): ws.set_column(c, c, w)
+    if df_det.empty: return
+    positions = index.positions if index is not None else df_det.groupby('Kode_Analisa', sort=False, observed=True).indices
+    komp = df_det['Komponen'].to_numpy(dtype=object)
+    coef = pd.to_numeric(df_det['Koefisien'], errors='coerce').to_numpy(dtype=float)
+    sat = df_det['Satuan'].to_numpy(dtype=object)
+    harga = pd.to_numeric(df_det['Harga_Dasar'], errors='coerce').to_numpy(dtype=float)
+    sub = pd.to_numeric(df_det['Subtotal'], errors='coerce').to_numpy(dtype=float)
+    uraian = df_det['Uraian_Pekerjaan'].to_numpy(dtype=object)
+    factor = 1 + overhead / 100
+    r = 0
+    for code, pos in positions.items():
+        ws.write_string(r, 0, f"{code} - {uraian[pos[0]]}", fm.bold); r += 1
+        for c, name in enumerate(('Komponen', 'Koefisien', 'Satuan', 'Harga Dasar', 'Subtotal')):
+            ws.write_string(r, c, name, fm.header)
+        r += 1
+        for p in pos:
+            _write_text(ws, r, 0, komp[p], None)
+            _write_number(ws, r, 1, coef[p], fm.coef)
+            _write_text(ws, r, 2, sat[p], None)
+            _write_number(ws, r, 3, harga[p], fm.money)
+            _write_number(ws, r, 4, sub[p], fm.money)
+            r += 1
+        total = float(sub[pos].sum())
+        ws.write_string(r, 0, 'TOTAL HARGA DASAR', fm.bold); _write_number(ws, r, 4, total, fm.money_bold); r += 1
+        ws.write_string(r, 0, f'HARGA JADI (+{overhead}%)', fm.bold); _write_number(ws, r, 4, total * factor, fm.money_total); r += 2
+
+def write_tender_package(target, df_rab, df_det, df_prices, df_material, overhead, project=None, index=None, ppn_rate=PPN_RATE):
+    """
+    Tulis Paket Tender ke target (path file atau objek file biner).
+    index: AnalysisIndex opsional agar blok AHSP tidak perlu groupby ulang.
+    """
+    wb = xlsxwriter.Workbook(target, {'constant_memory': True, 'nan_inf_to_errors': True})
+    try:
+        fm = _Formats(wb)
+        _sheet_rekap(wb, fm, df_rab, project or {}, ppn_rate)
+        _write_table(wb.add_worksheet('RAB'), df_rab, fm, formats={
+            'Volume': fm.number, 'Harga_Satuan_Jadi': fm.money, 'Total_Harga': fm.money,
+            'No': None, 'Durasi_Minggu': None, 'Minggu_Mulai': None
+        }, widths={'Uraian_Pekerjaan': 45, 'Divisi': 28})
+        _sheet_ahsp(wb, fm, df_det, overhead, index)
+        _write_table(wb.add_worksheet('HARGA DASAR'), df_prices, fm, formats={'Harga_Dasar': fm.money}, widths={'Komponen': 45})
+        _write_table(wb.add_worksheet('MATERIAL'), df_material, fm, formats={'Total_Biaya': fm.money}, widths={'Komponen': 45})
+        has_schedule = not df_rab.empty and pd.to_numeric(df_rab['Total_Harga'], errors='coerce').sum() > 0
+        curve = s_curve(df_rab) if has_schedule else pd.DataFrame(columns=['Minggu', 'Bobot', 'Progress', 'Biaya', 'Biaya_Kumulatif'])
+        _write_table(wb.add_worksheet('KURVA-S'), curve, fm, formats={
+            'Minggu': None, 'Bobot': fm.pct, 'Progress': fm.pct, 'Biaya': fm.money, 'Biaya_Kumulatif': fm.money})
+        cash = division_cashflow(weekly_plan(df_rab)) if has_schedule else pd.DataFrame()
+        cash = cash.reset_index().rename(columns={'index': 'Divisi'}) if not cash.empty else pd.DataFrame(columns=['Divisi'])
+        cash.columns = [c if isinstance(c, str) else f"Minggu {c}" for c in cash.columns]
+        _write_table(wb.add_worksheet('CASH FLOW'), cash, fm, formats={c: fm.money for c in cash.columns[1:]}, widths={'Divisi': 28})
+    finally:
+        wb.close()
+
+def tender_package_bytes(*args, **kwargs):
+    """write_tender_package ke memori -> bytes (untuk st.download_button)"""
+    out = io.BytesIO()
+    write_tender_package(out, *args, **kwargs)
+    return out.getvalue()
@@ -0,0 +1,108 @@
+"""
+Import massal di thread latar belakang (disimpan di session_state oleh app).
+Thread hanya mem-parse & mencatat hasil per file; penggabungan ke tabel sesi
+dilakukan oleh script Streamlit lewat commit() / take_ready() (urut upload, sehingga
+semantik drop_duplicates(keep='last') sama dengan import sinkron).
+Tahap dicatat ke profiler sesi: import (+ parse per file) dari thread, import_commit dari script.
+"""
+import threading
+import time
+
+from smartrab.parser import NamedBytesIO, _read_bytes, parse_files
+from smartrab.profiling import NULL_PROFILER
+
+PENDING, RUNNING, DONE, CANCELLED, FAILED = 'menunggu', 'berjalan', 'selesai', 'dibatalkan', 'gagal'
+
+class ImportJob:
+    """
+    Satu import massal: parse_files di thread daemon dengan progres per file & pembatalan.
+    Isi file disalin sekali saat dibuat (objek upload Streamlit tidak dipakai dari thread lain).
+    """
+    def __init__(self, files, columnar=True, parallel=False, max_workers=None, cache=None, profiler=NULL_PROFILER):
+        self.files = [NamedBytesIO(f.name, _read_bytes(f)) for f in files]
+        self.total = len(self.files)
+        self.profiler = profiler
+        self.options = {'columnar': columnar, 'parallel': parallel, 'max_workers': max_workers, 'cache': cache,
+                        'profiler': profiler}
+        self.state = PENDING
+        self.error = None
+        self.log = []
+        self.started = self.finished = None
+        self._results = [None] * self.total
+        self._taken = 0
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        self.state, self.started = RUNNING, time.time()
+        self._thread = threading.Thread(target=self._run, name='smartrab-import', daemon=True)
+        self._thread.start()
+        return self
+
+    def _on_result(self, i, res):
+        with self._lock:
+            self._results[i] = res
+            self.log.append(res[2] or f"✅ {self.files[i].name}")
+
+    def _run(self):
+        try:
+            with self.profiler.stage('import', rows=self.total):
+                parse_files(self.files, on_result=self._on_result, cancel=self._cancel, **self.options)
+            state = CANCELLED if self._cancel.is_set() and self.done < self.total else DONE
+        except Exception as e:
+            self.error, state = str(e), FAILED
+        with self._lock:
+            self.state, self.finished = state, time.time()
+
+    def cancel(self):
+        """Minta berhenti: file yang belum mulai dilewati (file yang sedang di-parse tetap diselesaikan)"""
+        self._cancel.set()
+
+    def join(self, timeout=None):
+        if self._thread is not None: self._thread.join(timeout)
+
+    @property
+    def running(self):
+        return self.state in (PENDING, RUNNING)
+
+    @property
+    def cancelling(self):
+        return self._cancel.is_set() and self.running
+
+    @property
+    def done(self):
+        with self._lock:
+            return sum(r is not None for r in self._results)
+
+    @property
+    def elapsed(self):
+        if self.started is None: return 0.0
+        return (self.finished or time.time()) - self.started
+
+    def take_ready(self):
+        """
+        Hasil yang siap digabung & belum pernah diambil, urut upload.
+        Selama berjalan hanya awalan yang sudah lengkap; setelah selesai / batal, sisa yang ada.
+        """
+        with self._lock:
+            end = self._taken
+            while end < self.total and self._results[end] is not None: end += 1
+            if not self.running: end = self.total
+            ready = [r for r in self._results[self._taken:end] if r is not None]
+            self._taken = end
+            return ready
+
+    def commit(self, merge):
+        """take_ready() lalu merge(hasil) (dicatat sebagai tahap import_commit). Return: jumlah file yang digabung"""
+        ready = self.take_ready()
+        if not ready: return 0
+        with self.profiler.stage('import_commit', rows=len(ready)):
+            merge(ready)
+        return len(ready)
+
+    @property
+    def pending_commit(self):
+        """True jika masih ada hasil yang belum diambil take_ready()"""
+        with self._lock:
+            return self.running or self._taken < self.total
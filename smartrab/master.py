@@ -0,0 +1,108 @@
+"""
+Master data bersama (harga & analisa) untuk banyak sesi dalam satu proses.
+Katalog di-parse & dihitung sekali, lalu dipakai read-only oleh setiap sesi:
+sesi hanya menyimpan RAB & perubahan harganya sendiri (IncrementalCalculator.fork
+menyalin kolom harga analisa baru ketika sesi itu benar-benar mengubah harga).
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+from smartrab.calc import IncrementalCalculator
+from smartrab.engine import DEFAULT_OVERHEAD, csv_files, merge_parse_results
+from smartrab.parser import parse_files
+from smartrab.schema import apply_schema, empty_table
+
+def content_key(files, base=''):
+    """Kunci isi sekumpulan file upload (nama + bytes, urut upload)"""
+    h = hashlib.sha256(base.encode())
+    for f in files:
+        data = f.getvalue()
+        h.update(f.name.encode() + b'\0' + len(data).to_bytes(8, 'little'))
+        h.update(data)
+    return h.hexdigest()
+
+class MasterCatalog:
+    """
+    Tabel harga & analisa bertipe + calculator dasar yang sudah menghitung
+    analisa detail. Objek ini dibagi antar sesi: jangan diubah setelah dibuat.
+    """
+    def __init__(self, prices, analysis, name='', key=None, msgs=()):
+        self.prices = apply_schema(prices, 'prices')
+        self.analysis = apply_schema(analysis, 'analysis')
+        self.name, self.key, self.msgs = name, key, list(msgs)
+        self.calculator = IncrementalCalculator()
+        self.calculator.recalc(self.prices, self.analysis, empty_table('rab'), DEFAULT_OVERHEAD)
+
+    @classmethod
+    def from_files(cls, files, name='', key=None, base=None, **kwargs):
+        """
+        Parse file upload (argumen lain diteruskan ke parse_files) menjadi katalog.
+        base: katalog yang sudah ada; file baru digabung di atas tabelnya (seperti upload biasa).
+        """
+        results = parse_files(files, **kwargs)
+        prices, analysis = (base.prices, base.analysis) if base is not None else (empty_table('prices'), empty_table('analysis'))
+        prices, analysis, msgs = merge_parse_results(prices, analysis, results)
+        return cls(prices, analysis, name=name, key=key, msgs=msgs)
+
+    @classmethod
+    def from_dir(cls, directory, **kwargs):
+        files = csv_files(directory)
+        return cls.from_files(files, name=directory, key=content_key(files), **kwargs)
+
+    def fork_calculator(self):
+        """Calculator baru untuk satu sesi yang memakai ulang hasil hitung katalog"""
+        return self.calculator.fork()
+
+    @property
+    def det(self):
+        return self.calculator.det
+
+    def memory_mb(self):
+        """Perkiraan memori tabel katalog (harga, analisa & analisa detail)"""
+        total = sum(df.memory_usage(deep=True).sum() for df in (self.prices, self.analysis, self.det))
+        return total / 1024 / 1024
+
+class MasterRegistry:
+    """
+    Katalog per kunci isi, aman dipakai banyak thread (sesi Streamlit).
+    Sesi yang meminta kunci yang sama saat sedang dibangun menunggu hasil yang sama.
+    Hanya max_entries katalog terakhir yang dipertahankan.
+    """
+    def __init__(self, max_entries=4):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._building = {}
+        self._catalogs = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            cat = self._catalogs.get(key)
+            if cat is not None: self._catalogs.move_to_end(key)
+            return cat
+
+    def get_or_build(self, key, build):
+        """
+        Katalog untuk key; build() dipanggil sekali per key walau diminta banyak sesi bersamaan.
+        Jika build() gagal, error diteruskan & key bisa dibangun lagi oleh pemanggil berikutnya.
+        """
+        cat = self.get(key)
+        if cat is not None: return cat
+        with self._lock:
+            lock = self._building.setdefault(key, threading.Lock())
+        with lock:
+            try:
+                cat = self.get(key)
+                if cat is None:
+                    cat = build()
+                    with self._lock:
+                        self._catalogs[key] = cat
+                        while len(self._catalogs) > self.max_entries: self._catalogs.popitem(last=False)
+            finally:
+                # Juga saat build() gagal: pemanggil berikutnya membangun ulang, bukan menunggu entri basi
+                with self._lock:
+                    if self._building.get(key) is lock: del self._building[key]
+        return cat
+
+    def __len__(self):
+        return len(self._catalogs)
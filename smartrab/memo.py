@@ -0,0 +1,54 @@
+"""
+Memoisasi view turunan berbasis versi tabel.
+Setiap tabel (df_prices, df_analysis, df_rab, ...) punya versi yang naik
+monoton setiap kali isinya diganti; view turunan di-cache dengan kunci
+(nama view, versi tabel sumber, parameter) dalam LRU berukuran terbatas.
+"""
+from collections import OrderedDict
+from itertools import count
+
+class TableVersions:
+    """Versi monoton per tabel. Naik saat bump() dipanggil atau objek tabel diganti."""
+
+    def __init__(self):
+        self._counter = count(1)
+        self._ver = {}
+        self._obj = {}
+
+    def bump(self, name, obj=None):
+        self._ver[name] = next(self._counter)
+        self._obj[name] = obj
+        return self._ver[name]
+
+    def get(self, name, obj):
+        """Versi tabel; objek yang berbeda dari terakhir tercatat dianggap versi baru"""
+        if name not in self._ver or self._obj[name] is not obj:
+            return self.bump(name, obj)
+        return self._ver[name]
+
+class MemoCache:
+    """Cache LRU berukuran terbatas untuk hasil view turunan"""
+
+    def __init__(self, max_entries=128):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key, fn):
+        if key in self._data:
+            self._data.move_to_end(key)
+            self.hits += 1
+            return self._data[key]
+        self.misses += 1
+        value = fn()
+        self._data[key] = value
+        if len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+        return value
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
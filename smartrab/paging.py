@@ -0,0 +1,82 @@
+"""
+Tampilan tabel besar per halaman: index pencarian teks yang dihitung sekali per
+versi tabel, potongan halaman (posisi baris) & penerapan delta st.data_editor
+(edited_rows / added_rows / deleted_rows) ke tabel penuh tanpa membandingkan
+seluruh tabel.
+"""
+import numpy as np
+import pandas as pd
+
+from smartrab.parser import STR_DTYPE
+
+PAGE_SIZES = [50, 100, 200, 500]
+
+class SearchIndex:
+    """Pencarian tanpa beda huruf besar/kecil atas gabungan beberapa kolom; semua kata harus ada"""
+
+    def __init__(self, *columns):
+        n = len(columns[0]) if columns else 0
+        text = pd.Series([''] * n, dtype=STR_DTYPE)
+        for col in columns:
+            part = pd.Series(np.asarray(col, dtype=object)).fillna('').astype(str).astype(STR_DTYPE)
+            text = text + ' ' + part.str.lower()
+        self.text = text
+        self.all = np.arange(n)
+
+    def __len__(self):
+        return len(self.all)
+
+    def search(self, query, limit=None):
+        """Posisi baris yang cocok (urutan asli); query kosong = semua baris"""
+        terms = str(query or '').lower().split()
+        if not terms: return self.all[:limit]
+        mask = np.ones(len(self.all), dtype=bool)
+        for t in terms:
+            mask &= self.text.str.contains(t, regex=False).to_numpy(dtype=bool)
+        return self.all[mask][:limit]
+
+def page_bounds(n, page, page_size):
+    """(awal, akhir, jumlah halaman) untuk halaman ke-page (mulai 1), page dibatasi ke rentang valid"""
+    pages = max(1, -(-n // page_size))
+    page = min(max(1, int(page)), pages)
+    start = (page - 1) * page_size
+    return start, min(start + page_size, n), pages
+
+def has_edits(state):
+    """True jika state st.data_editor berisi perubahan"""
+    return bool(state) and any(state.get(k) for k in ('edited_rows', 'added_rows', 'deleted_rows'))
+
+def apply_editor_delta(df, positions, state, defaults=None, counter=None):
+    """
+    Terapkan delta st.data_editor atas potongan df.iloc[positions] ke tabel penuh.
+    Kolom yang diedit diganti utuh (nilai object; tipe dipulihkan lewat apply_schema oleh pemanggil).
+    Baris baru diisi defaults untuk kolom yang kosong; kolom counter (nomor urut, mis. 'No')
+    yang kosong diberi len(df)+1, len(df)+2, ... per baris baru. Return: DataFrame baru (df tidak diubah).
+    """
+    positions = np.asarray(positions)
+    out = df.copy(deep=False)
+    edits = {}
+    for pos, row in (state.get('edited_rows') or {}).items():
+        for col, val in row.items():
+            if col in out.columns: edits.setdefault(col, {})[positions[int(pos)]] = val
+    for col, cells in edits.items():
+        arr = out[col].to_numpy(dtype=object, copy=True)
+        arr[list(cells)] = list(cells.values())
+        out[col] = pd.Series(arr, index=out.index)
+    deleted = [positions[int(p)] for p in state.get('deleted_rows') or ()]
+    added = [{c: row.get(c) for c in out.columns} for row in state.get('added_rows') or ()]
+    if deleted:
+        keep = np.ones(len(out), dtype=bool)
+        keep[deleted] = False
+        out = out.iloc[keep]
+    if added:
+        new = pd.DataFrame(added, columns=out.columns)
+        for c, v in (defaults or {}).items():
+            if c in new.columns: new[c] = new[c].astype(object).where(new[c].notna(), v)
+        if counter in new.columns:
+            numbers = pd.Series(np.arange(len(df) + 1, len(df) + 1 + len(new)), dtype=object)
+            new[counter] = new[counter].astype(object).where(new[counter].notna(), numbers)
+        out = pd.concat([out, new], ignore_index=True)
+    elif deleted:
+        out = out.reset_index(drop=True)
+    return out
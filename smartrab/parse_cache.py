@@ -0,0 +1,94 @@
+"""
+Cache parse persisten di disk (content-addressed).
+Kunci = hash isi file + nama file + PARSER_VERSION + mode parser (kolumnar / per baris), isi = baris hasil parse
+dalam Parquet. Ukuran total dibatasi; entri paling lama tidak dipakai dibuang (LRU).
+"""
+import hashlib
+import os
+import tempfile
+
+import pandas as pd
+
+from smartrab.parser import PARSER_VERSION, result_message
+
+DEFAULT_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'smartrab', 'parse')
+DEFAULT_MAX_MB = 512
+
+class ParseCache:
+    """Cache hasil parse_file per isi file (Parquet + eviction LRU berbasis ukuran)"""
+    KINDS = ('harga', 'analisa')
+
+    def __init__(self, cache_dir=None, max_bytes=None):
+        self.cache_dir = cache_dir or os.environ.get('SMARTRAB_CACHE_DIR', DEFAULT_DIR)
+        if max_bytes is None:
+            max_bytes = int(float(os.environ.get('SMARTRAB_CACHE_MB', DEFAULT_MAX_MB)) * 1024 * 1024)
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(name, data, columnar=True):
+        """Hash isi file; nama ikut karena divisi & jenis file dideteksi dari nama, mode karena heuristiknya berbeda"""
+        h = hashlib.sha256(f"v{PARSER_VERSION}|{'col' if columnar else 'row'}|{name}|".encode())
+        h.update(data)
+        return h.hexdigest()
+
+    def _path(self, key, kind):
+        return os.path.join(self.cache_dir, f"{key}.{kind}.parquet")
+
+    def get(self, name, data, columnar=True):
+        """(jenis, DataFrame, pesan) jika ada di cache, selain itu None"""
+        key = self.key(name, data, columnar)
+        for kind in self.KINDS:
+            path = self._path(key, kind)
+            if not os.path.exists(path): continue
+            try:
+                rows = pd.read_parquet(path)
+            except Exception:
+                self._remove(path)
+                return None
+            os.utime(path)  # tandai baru dipakai (LRU)
+            msg = result_message(kind, name, len(rows))
+            return kind, rows, (msg + " ♻️ cache") if msg else None
+        return None
+
+    def put(self, name, data, result, columnar=True):
+        """Simpan hasil parse (hasil error tidak disimpan)"""
+        kind, rows, _ = result
+        if kind not in self.KINDS or rows is None: return
+        path = self._path(self.key(name, data, columnar), kind)
+        tmp = None
+        try:
+            fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            os.close(fd)
+            rows.to_parquet(tmp, index=False)
+            os.replace(tmp, path)  # atomik: pembaca tidak pernah melihat file setengah jadi
+        except Exception:
+            self._remove(tmp)
+            return
+        self.evict()
+
+    def evict(self):
+        """Buang entri paling lama tidak dipakai sampai total ukuran <= max_bytes"""
+        entries = []
+        for fn in os.listdir(self.cache_dir):
+            if not fn.endswith('.parquet'): continue
+            try:
+                st_ = os.stat(os.path.join(self.cache_dir, fn))
+                entries.append((st_.st_mtime, st_.st_size, fn))
+            except OSError:
+                continue
+        total = sum(e[1] for e in entries)
+        for _, size, fn in sorted(entries):
+            if total <= self.max_bytes: break
+            self._remove(os.path.join(self.cache_dir, fn))
+            total -= size
+
+    def clear(self):
+        for fn in os.listdir(self.cache_dir):
+            if fn.endswith('.parquet'): self._remove(os.path.join(self.cache_dir, fn))
+
+    @staticmethod
+    def _remove(path):
+        if not path: return
+        try: os.remove(path)
+        except OSError: pass
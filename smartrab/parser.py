@@ -0,0 +1,418 @@
+"""
+BRUTAL PARSER ENGINE (PENYEDOT DEBU)
+Menyedot data Harga Dasar & Analisa dari CSV tanpa peduli struktur header.
+Tidak bergantung pada Streamlit agar bisa dijalankan di process pool.
+"""
+import io
+import re
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import multiprocessing as mp
+
+import numpy as np
+import pandas as pd
+
+from smartrab.profiling import Profiler, NULL_PROFILER
+
+# Operasi string vektor memakai kernel Arrow jika pyarrow terpasang (requirements.txt)
+try:
+    import pyarrow  # noqa: F401
+    STR_DTYPE = "string[pyarrow]"
+except ImportError:
+    STR_DTYPE = object
+
+# ==========================================
+# 0. HELPER FUNCTIONS
+# ==========================================
+def clean_currency(val):
+    """Membersihkan format uang (Rp 1.000.000 -> 1000000)"""
+    if pd.isna(val) or val == '': return 0.0
+    s = str(val).replace('Rp', '').replace('.', '').replace(' ', '').replace(',', '.')
+    try: return float(s)
+    except: return 0.0
+
+def normalize_text(text):
+    """Normalisasi teks untuk pencocokan (lowercase, no simbol)"""
+    if not isinstance(text, str): return ""
+    return text.lower().strip().replace('"', '').replace("'", "")
+
+def detect_division(filename):
+    """Mendeteksi Divisi berdasarkan Nama File"""
+    fn = filename.lower()
+    if 'persiapan' in fn or 'bongkaran' in fn: return "Divisi 1: Umum & Persiapan"
+    if 'tanah' in fn or 'galian' in fn or 'timbunan' in fn: return "Divisi 2: Pekerjaan Tanah"
+    if 'pondasi' in fn or 'beton' in fn or 'baja' in fn or 'struktur' in fn: return "Divisi 3: Struktur"
+    if 'dinding' in fn or 'plesteran' in fn or 'lantai' in fn: return "Divisi 4: Arsitektur"
+    if 'pintu' in fn or 'jendela' in fn or 'kaca' in fn or 'kusen' in fn: return "Divisi 5: Kusen & Pintu"
+    if 'atap' in fn or 'plafon' in fn: return "Divisi 6: Atap & Plafon"
+    if 'cat' in fn or 'pengecatan' in fn: return "Divisi 7: Pengecatan"
+    if 'sanitair' in fn or 'air' in fn or 'pipa' in fn or 'drainase' in fn: return "Divisi 8: MEP & Sanitasi"
+    if 'listrik' in fn or 'elektrikal' in fn: return "Divisi 9: Elektrikal"
+    return "Divisi 10: Lain-lain"
+
+# ==========================================
+# 1. PARSER PER FILE
+# ==========================================
+# Keyword untuk mendeteksi file Master Harga
+PRICE_KEYWORDS = ['upah', 'bahan', 'harga', 'basic', 'dasar']
+
+# Regex untuk mendeteksi Kode Analisa (Contoh: A.2.2.1 atau 2.2.1)
+REGEX_CODE = re.compile(r'^([A-Z]\.|[\d]+\.)[\d\.]+$')
+
+# Range koefisien masuk akal
+COEF_MIN, COEF_MAX = 0.0001, 500.0
+
+# Naikkan setiap kali heuristik parser berubah (membatalkan cache parse lama)
+PARSER_VERSION = 2
+
+def read_raw_csv(f, fast=True):
+    """
+    Baca CSV apa adanya (Header None = Baca dari baris 0).
+    Mode fast memakai engine C; jika gagal, ulang dengan engine 'python'
+    yang lebih tahan banting terhadap error baris.
+    """
+    if fast:
+        try:
+            f.seek(0)
+            return pd.read_csv(f, header=None, on_bad_lines='skip')
+        except Exception:
+            pass
+    f.seek(0)
+    return pd.read_csv(f, header=None, engine='python', on_bad_lines='skip')
+
+def extract_price_rows(df_raw):
+    """Logika Master Harga (per baris): Cari baris yang ada 'Rp' atau angka besar"""
+    price_data = []
+    for _, row in df_raw.iterrows():
+        # Ubah row jadi list string untuk dicek
+        vals = [str(x).strip() for x in row.values if pd.notna(x)]
+        
+        # Cari angka harga (biasanya > 100 dan bukan tahun)
+        found_price = 0
+        found_desc = ""
+        found_unit = "Unit"
+        found_code = ""
+        
+        for v in vals:
+            # Coba bersihkan format uang
+            clean_v = clean_currency(v)
+            if clean_v > 50: # Asumsi harga minimal 50 perak
+                found_price = clean_v
+            elif len(v) > 3 and not v[0].isdigit(): # Kemungkinan Deskripsi
+                found_desc = v
+            elif len(v) <= 5 and v.isalpha(): # Kemungkinan Satuan
+                found_unit = v
+            elif ("M." in v or "L." in v or "E." in v): # Kemungkinan Kode
+                found_code = v
+                
+        if found_price > 0 and found_desc:
+            cat = 'Upah' if 'L.' in found_code else ('Alat' if 'E.' in found_code else 'Material')
+            price_data.append({
+                'Kode': found_code, 'Komponen': found_desc, 
+                'Satuan': found_unit, 'Harga_Dasar': found_price, 'Kategori': cat
+            })
+    return pd.DataFrame(price_data)
+
+def extract_analysis_rows(df_raw, fname, detected_div):
+    """Logika Analisa (per baris): Cari baris yang punya Angka Kecil (Koefisien) dan Teks"""
+    new_analyses = []
+    current_parent_code = "X.0.0"
+    current_parent_desc = f"Item dari {fname}"
+    
+    for _, row in df_raw.iterrows():
+        # Ambil nilai yang tidak kosong
+        vals = [v for v in row.values if pd.notna(v) and str(v).strip() != '']
+        if len(vals) < 2: continue
+        
+        # Cek apakah ini HEADER PEKERJAAN? (Biasanya di kolom awal ada Kode A.x.x)
+        str_vals = [str(x).strip() for x in vals]
+        potential_code = str_vals[0]
+        
+        if REGEX_CODE.match(potential_code) and len(str_vals) >= 2:
+            current_parent_code = potential_code
+            # Deskripsi biasanya elemen kedua terpanjang
+            current_parent_desc = max(str_vals, key=len) 
+            continue
+            
+        # Cek apakah ini KOMPONEN? (Harus ada angka desimal/koefisien)
+        has_coef = False
+        coef_val = 0
+        comp_name = ""
+        
+        for v in vals:
+            try:
+                # Cek apakah angka float (koefisien)
+                vv = float(str(v).replace(',', '.'))
+                if COEF_MIN <= vv <= COEF_MAX:
+                    has_coef = True
+                    coef_val = vv
+            except:
+                # Jika bukan angka, mungkin ini nama komponen
+                s = str(v).strip()
+                if len(s) > 3 and not REGEX_CODE.match(s): # Bukan kode
+                    comp_name = s
+        
+        if has_coef and comp_name and current_parent_code != "X.0.0":
+            new_analyses.append({
+                'Kode_Analisa': current_parent_code,
+                'Uraian_Pekerjaan': current_parent_desc,
+                'Komponen': comp_name,
+                'Koefisien': coef_val,
+                'Divisi_Ref': detected_div
+            })
+    return pd.DataFrame(new_analyses)
+
+# --- Mode Kolumnar: heuristik yang sama, dihitung per kolom / per nilai unik ---
+def _cell_table(df_raw):
+    """
+    Sel tidak kosong dalam format panjang (urut baris lalu kolom, seperti iterrows).
+    Return: (row_idx, teks sel str(x).strip(), kode faktor, nilai unik)
+    """
+    n_rows, n_cols = df_raw.shape
+    if n_rows == 0 or n_cols == 0:
+        empty = np.array([], dtype=np.int64)
+        return empty, np.array([], dtype=object), empty, np.array([], dtype=object)
+    text = np.empty((n_rows, n_cols), dtype=object)
+    for j in range(n_cols):
+        text[:, j] = df_raw.iloc[:, j].astype(str).str.strip().to_numpy(dtype=object)
+    mask = df_raw.notna().to_numpy() & (text != '')
+    row_idx, col_idx = np.nonzero(mask)
+    cells = text[row_idx, col_idx]
+    codes, uniques = pd.factorize(cells)
+    return row_idx, cells, codes, np.asarray(uniques, dtype=object)
+
+def _last_per_row(row_idx, hit, n_rows):
+    """Posisi sel terakhir (per baris) yang memenuhi mask hit; -1 jika tidak ada"""
+    pos = np.full(n_rows, -1, dtype=np.int64)
+    sel = np.nonzero(hit)[0]
+    np.maximum.at(pos, row_idx[sel], sel)
+    return pos
+
+def _parse_float(s):
+    try: return float(s.replace(',', '.'))
+    except: return None
+
+# Role sel di file harga (urutan prioritas if/elif sama dengan versi per baris)
+ROLE_PRICE, ROLE_DESC, ROLE_UNIT, ROLE_CODE = 1, 2, 3, 4
+
+def clean_currency_series(s):
+    """clean_currency versi vektor untuk Series teks (gagal parse -> 0.0)"""
+    # strip: spasi Unicode di tepi (mis. 'Rp\xa01.000') ditoleransi seperti float()
+    s = s.str.replace(r'Rp|[. ]', '', regex=True).str.replace(',', '.', regex=False).str.strip()
+    return pd.to_numeric(s, errors='coerce').astype(float).fillna(0.0).to_numpy()
+
+def classify_price_cells(text):
+    """
+    Klasifikasi sel teks (sudah str.strip) file harga, semua operasi string per kolom.
+    Return: (harga hasil clean_currency, role per sel: 0 / ROLE_PRICE / ROLE_DESC / ROLE_UNIT / ROLE_CODE)
+    """
+    price = clean_currency_series(text)
+    n = text.str.len().to_numpy()
+    first_digit = text.str[:1].str.isdigit().to_numpy(dtype=bool)
+    is_price = price > 50  # Asumsi harga minimal 50 perak
+    is_desc = (n > 3) & ~first_digit
+    is_unit = (n <= 5) & text.str.isalpha().to_numpy(dtype=bool)
+    is_code = text.str.contains(r'[MLE]\.', regex=True).to_numpy(dtype=bool)
+    role = np.select([is_price, is_desc, is_unit, is_code],
+                     [ROLE_PRICE, ROLE_DESC, ROLE_UNIT, ROLE_CODE], 0).astype(np.int8)
+    return price, role
+
+def price_category(codes):
+    """Kategori dari Kode harga secara vektor: L. -> Upah, E. -> Alat, sisanya Material"""
+    codes = pd.Series(codes, dtype=object).astype(str)
+    return np.select([codes.str.contains('L.', regex=False), codes.str.contains('E.', regex=False)],
+                     ['Upah', 'Alat'], 'Material')
+
+def extract_price_rows_columnar(df_raw):
+    """
+    Logika Master Harga versi kolumnar. Hasil sama dengan extract_price_rows, kecuali
+    teks angka yang diterima float() tapi tidak oleh pd.to_numeric ('1_000', digit non-ASCII) -> 0.
+    Nilai unik diklasifikasi sekaligus dengan operasi string vektor, lalu per baris
+    diambil sel TERAKHIR tiap role (semantik "last wins" versi per baris).
+    """
+    n_rows = len(df_raw)
+    row_idx, cells, codes, uniques = _cell_table(df_raw)
+    price_u, role_u = classify_price_cells(pd.Series(uniques, dtype=STR_DTYPE))
+    role = role_u[codes]
+    
+    # Per role: nilai terakhir di baris yang menang
+    p_pos, d_pos, u_pos, k_pos = (_last_per_row(row_idx, role == r, n_rows)
+                                  for r in (ROLE_PRICE, ROLE_DESC, ROLE_UNIT, ROLE_CODE))
+    keep = (p_pos >= 0) & (d_pos >= 0)
+    if not keep.any(): return pd.DataFrame()
+    
+    code = np.where(k_pos[keep] >= 0, cells[k_pos[keep]], "")
+    return pd.DataFrame({
+        'Kode': code, 'Komponen': cells[d_pos[keep]],
+        'Satuan': np.where(u_pos[keep] >= 0, cells[u_pos[keep]], "Unit"),
+        'Harga_Dasar': price_u[codes[p_pos[keep]]], 'Kategori': price_category(code)
+    })
+
+def extract_analysis_rows_columnar(df_raw, fname, detected_div):
+    """Logika Analisa versi kolumnar (hasil identik dengan extract_analysis_rows)"""
+    n_rows = len(df_raw)
+    row_idx, cells, codes, uniques = _cell_table(df_raw)
+    
+    # Atribut per nilai unik: angka (koefisien), kode analisa, panjang teks
+    nums = [_parse_float(v) for v in uniques]
+    is_num_u = np.array([x is not None for x in nums], dtype=bool)
+    num_u = np.array([x if x is not None else np.nan for x in nums], dtype=float)
+    is_code_u = np.array([bool(REGEX_CODE.match(v)) for v in uniques], dtype=bool)
+    len_u = np.array([len(v) for v in uniques], dtype=np.int64)
+    
+    # Baris valid minimal 2 nilai; HEADER jika nilai pertama berupa Kode Analisa
+    count = np.bincount(row_idx, minlength=n_rows)
+    first = np.full(n_rows, -1, dtype=np.int64)
+    first_rows, first_pos = np.unique(row_idx, return_index=True)
+    first[first_rows] = first_pos
+    valid = count >= 2
+    header = valid.copy()
+    header[valid] = is_code_u[codes[first[valid]]]
+    
+    # Deskripsi header = teks terpanjang pertama di baris tsb
+    lens = pd.Series(len_u[codes])
+    longest = lens.groupby(row_idx).idxmax()
+    parent_code = pd.Series(np.nan, index=range(n_rows), dtype=object)
+    parent_desc = pd.Series(np.nan, index=range(n_rows), dtype=object)
+    h_rows = np.nonzero(header)[0]
+    parent_code.iloc[h_rows] = cells[first[h_rows]]
+    parent_desc.iloc[h_rows] = cells[longest.loc[h_rows].to_numpy()]
+    parent_code = parent_code.ffill().fillna("X.0.0").to_numpy()
+    parent_desc = parent_desc.ffill().fillna(f"Item dari {fname}").to_numpy()
+    
+    # KOMPONEN: koefisien terakhir dalam range & nama terakhir (bukan angka, > 3 huruf, bukan kode)
+    coef_hit = is_num_u & (num_u >= COEF_MIN) & (num_u <= COEF_MAX)
+    name_hit = ~is_num_u & (len_u > 3) & ~is_code_u
+    c_pos = _last_per_row(row_idx, coef_hit[codes], n_rows)
+    n_pos = _last_per_row(row_idx, name_hit[codes], n_rows)
+    keep = valid & ~header & (c_pos >= 0) & (n_pos >= 0) & (parent_code != "X.0.0")
+    if not keep.any(): return pd.DataFrame()
+    
+    return pd.DataFrame({
+        'Kode_Analisa': parent_code[keep],
+        'Uraian_Pekerjaan': parent_desc[keep],
+        'Komponen': cells[n_pos[keep]],
+        'Koefisien': num_u[codes[c_pos[keep]]],
+        'Divisi_Ref': detected_div
+    })
+
+def result_message(kind, name, n_rows):
+    """Pesan log standar untuk hasil parse satu file"""
+    if kind == 'harga': return f"✅ Master Harga: {name} ({n_rows} item)" if n_rows else None
+    return f"✅ Analisa: {name} ({n_rows} baris)" if n_rows else f"⚠️ {name}: Format tidak standar, mencoba skip."
+
+def parse_file(f, columnar=True, profiler=NULL_PROFILER):
+    """
+    Parse satu file upload.
+    Return: (jenis 'harga' / 'analisa', DataFrame baris hasil, pesan log)
+    """
+    # Deteksi Divisi dari Nama File
+    fname = f.name.lower()
+    detected_div = detect_division(fname)
+    with profiler.stage('read_csv') as stage:
+        df_raw = read_raw_csv(f, fast=columnar)
+        stage.rows = len(df_raw)
+    
+    # CEK 1: Apakah ini File HARGA DASAR?
+    if any(k in fname for k in PRICE_KEYWORDS):
+        with profiler.stage('extract_price_rows') as stage:
+            rows = extract_price_rows_columnar(df_raw) if columnar else extract_price_rows(df_raw)
+            stage.rows = len(rows)
+        return 'harga', rows, result_message('harga', f.name, len(rows))
+    
+    # CEK 2: Ini File ANALISA
+    with profiler.stage('extract_analysis_rows') as stage:
+        if columnar: rows = extract_analysis_rows_columnar(df_raw, f.name, detected_div)
+        else: rows = extract_analysis_rows(df_raw, f.name, detected_div)
+        stage.rows = len(rows)
+    return 'analisa', rows, result_message('analisa', f.name, len(rows))
+
+def parse_upload(f, columnar=True, profiler=NULL_PROFILER):
+    """parse_file yang tidak pernah raise: error dikembalikan sebagai ('error', None, pesan)"""
+    try:
+        return parse_file(f, columnar, profiler)
+    except Exception as e:
+        return 'error', None, f"❌ Error Fatal {f.name}: {str(e)}"
+
+# ==========================================
+# 2. PARSER MULTI FILE (PROCESS POOL)
+# ==========================================
+class NamedBytesIO(io.BytesIO):
+    """BytesIO dengan atribut .name (pengganti UploadedFile di worker)"""
+    def __init__(self, name, data):
+        super().__init__(data)
+        self.name = name
+
+def _read_bytes(f):
+    if hasattr(f, 'getvalue'): return f.getvalue()
+    f.seek(0)
+    return f.read()
+
+def _parse_bytes(name, data, columnar):
+    """Worker process pool: parse satu file dari bytes"""
+    return parse_upload(NamedBytesIO(name, data), columnar)
+
+def _parse_bytes_timed(name, data, columnar):
+    """_parse_bytes + catatan tahap dari worker: (hasil, records profiler lokal)"""
+    local = Profiler(enabled=True, memory=False)
+    return parse_upload(NamedBytesIO(name, data), columnar, local), local.records
+
+def parse_files(files, columnar=True, parallel=False, max_workers=None, on_progress=None, cache=None, profiler=NULL_PROFILER,
+                on_result=None, cancel=None):
+    """
+    Parse banyak file. Hasil selalu dikembalikan URUT UPLOAD (agar semantik
+    drop_duplicates(keep='last') tetap sama), apa pun urutan selesainya.
+    parallel=True: tiap file di-parse di process pool (semua core).
+    cache: ParseCache opsional; file yang isinya sudah pernah di-parse dilewati.
+    on_progress(selesai, total, pesan) dipanggil setiap satu file selesai.
+    profiler: tahap read_csv / heuristik per file dicatat (juga dari worker pool).
+    on_result(i, hasil) dipanggil untuk setiap file yang selesai (i = indeks urut upload).
+    cancel (threading.Event): jika di-set, file yang belum mulai dilewati & hasilnya None.
+    """
+    total = len(files)
+    results = [None] * total
+    payloads = [_read_bytes(f) for f in files]
+    
+    def done(i, res, fresh=True):
+        results[i] = res
+        if fresh and cache is not None: cache.put(files[i].name, payloads[i], res, columnar)
+        if on_result: on_result(i, res)
+        if on_progress: on_progress(sum(r is not None for r in results), total, res[2] or f"✅ {files[i].name}")
+    
+    if cache is not None:
+        with profiler.stage('cache_lookup', rows=total):
+            for i, f in enumerate(files):
+                hit = cache.get(f.name, payloads[i], columnar)
+                if hit is not None: done(i, hit, fresh=False)
+    todo = [i for i in range(total) if results[i] is None]
+    
+    workers = min(max_workers or os.cpu_count() or 1, len(todo))
+    if parallel and workers > 1:
+        try:
+            # 'spawn' agar worker tidak mewarisi thread server Streamlit
+            with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context('spawn')) as pool:
+                task = _parse_bytes_timed if profiler.enabled else _parse_bytes
+                futures = {pool.submit(task, files[i].name, payloads[i], columnar): i for i in todo}
+                for fut in as_completed(futures):
+                    i = futures[fut]
+                    try:
+                        res = fut.result()
+                        if profiler.enabled:
+                            res, records = res
+                            for r in records: profiler.add(f"file:{files[i].name}/{r['stage']}", r['seconds'], r['rows'])
+                    except Exception as e: res = ('error', None, f"❌ Error Fatal {files[i].name}: {str(e)}")
+                    done(i, res)
+                    if cancel is not None and cancel.is_set():
+                        pool.shutdown(wait=False, cancel_futures=True)
+                        break
+            return results
+        except OSError:
+            pass  # Pool tidak bisa dibuat (mis. sandbox) -> lanjut berurutan
+    
+    for i in todo:
+        if cancel is not None and cancel.is_set(): break
+        if results[i] is None:
+            with profiler.stage(f"file:{files[i].name}"):
+                res = parse_upload(NamedBytesIO(files[i].name, payloads[i]), columnar, profiler)
+            done(i, res)
+    return results
@@ -0,0 +1,136 @@
+"""
+Instrumentasi tahap (opt-in): waktu, jumlah baris & delta memori per tahap bernama.
+Tahap bisa bersarang; nama tercatat sebagai path ("calculate_system/match_prices").
+Tumpukan tahap per thread: import latar belakang (smartrab.jobs) bisa merekam ke profiler sesi yang sama.
+Saat nonaktif, stage() mengembalikan context kosong bersama (overhead ~ satu cek atribut).
+Delta memori (tracemalloc) opt-in terpisah: tracemalloc berlaku untuk seluruh proses
+(memperlambat semua sesi), jadi dinyalakan selama masih ada profiler yang memakainya.
+Hasil bisa diekspor sebagai JSON lines untuk diagregasi lintas sesi.
+"""
+import json
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import deque
+
+class _NullStage:
+    """Context kosong saat profiler nonaktif; atribut rows boleh diisi dan diabaikan"""
+    rows = None
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+    def __setattr__(self, name, value): pass
+
+_NULL_STAGE = _NullStage()
+
+_trace_lock = threading.Lock()
+_trace_users = 0
+
+def _trace_acquire():
+    """tracemalloc dinyalakan oleh pemakai pertama (jika belum dinyalakan pihak lain)"""
+    global _trace_users
+    with _trace_lock:
+        _trace_users += 1
+        if _trace_users == 1 and not tracemalloc.is_tracing(): tracemalloc.start()
+
+def _trace_release():
+    """tracemalloc dimatikan saat pemakai terakhir selesai"""
+    global _trace_users
+    with _trace_lock:
+        _trace_users -= 1
+        if _trace_users == 0 and tracemalloc.is_tracing(): tracemalloc.stop()
+
+class _Stage:
+    __slots__ = ('profiler', 'name', 'rows', 't0', 'm0')
+
+    def __init__(self, profiler, name, rows):
+        self.profiler, self.name, self.rows = profiler, name, rows
+
+    def __enter__(self):
+        p = self.profiler
+        p._stack.append(self.name)
+        self.m0 = tracemalloc.get_traced_memory()[0] if p._tracing else None
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        seconds = time.perf_counter() - self.t0
+        p = self.profiler
+        mem = (tracemalloc.get_traced_memory()[0] - self.m0) / 1024 / 1024 if self.m0 is not None and p._tracing else None
+        p._records.append({
+            'session': p.session, 'ts': round(time.time(), 3), 'stage': '/'.join(p._stack),
+            'seconds': round(seconds, 6), 'rows': self.rows,
+            'mem_delta_mb': round(mem, 3) if mem is not None else None, 'error': exc_type.__name__ if exc_type else None
+        })
+        p._stack.pop()
+        return False
+
+class Profiler:
+    """
+    Perekam tahap per sesi (maksimal max_records catatan terakhir).
+    memory=True: ukur delta memori dengan tracemalloc selama profiler aktif.
+    Panggil disable() sebelum profiler dibuang (dibuang tanpa disable() -> dilepas saat di-GC).
+    """
+
+    def __init__(self, enabled=False, memory=False, max_records=5000):
+        self.session = uuid.uuid4().hex[:12]
+        self.memory = memory
+        self.enabled = False
+        self._tracing = False
+        self._local = threading.local()
+        self._records = deque(maxlen=max_records)
+        if enabled: self.enable()
+
+    def enable(self):
+        self.enabled = True
+        self._sync_tracing()
+
+    def disable(self):
+        self.enabled = False
+        self._sync_tracing()
+
+    def set_memory(self, memory):
+        """Nyalakan / matikan pengukuran delta memori (berlaku saat profiler aktif)"""
+        self.memory = memory
+        self._sync_tracing()
+
+    def _sync_tracing(self):
+        want = self.enabled and self.memory
+        if want and not self._tracing: _trace_acquire()
+        elif self._tracing and not want: _trace_release()
+        self._tracing = want
+
+    def __del__(self):
+        if getattr(self, '_tracing', False): _trace_release()
+
+    @property
+    def _stack(self):
+        """Tumpukan nama tahap milik thread pemanggil"""
+        stack = getattr(self._local, 'stack', None)
+        if stack is None: stack = self._local.stack = []
+        return stack
+
+    def stage(self, name, rows=None):
+        """Context manager satu tahap; isi .rows di dalam blok jika jumlah baris baru diketahui"""
+        if not self.enabled: return _NULL_STAGE
+        return _Stage(self, name, rows)
+
+    def add(self, name, seconds, rows=None):
+        """Catat tahap yang diukur di tempat lain (mis. di worker process pool)"""
+        if not self.enabled: return
+        self._records.append({
+            'session': self.session, 'ts': round(time.time(), 3), 'stage': '/'.join(self._stack + [name]),
+            'seconds': round(seconds, 6), 'rows': rows, 'mem_delta_mb': None, 'error': None
+        })
+
+    @property
+    def records(self):
+        return list(self._records)
+
+    def clear(self):
+        self._records.clear()
+
+    def to_jsonl(self):
+        return ''.join(json.dumps(r, ensure_ascii=False) + '\n' for r in self._records)
+
+NULL_PROFILER = Profiler(enabled=False)
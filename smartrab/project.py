@@ -0,0 +1,130 @@
+"""
+Simpan / buka proyek dalam satu file biner (.srab).
+Isi: tabel harga, analisa, RAB (+ analisa detail & hasil pencocokan harga agar
+proyek besar tidak perlu dihitung ulang dari nol) dan metadata JSON.
+
+Tata letak file: MAGIC | tabel Arrow IPC (tanpa kompresi, rata 64 byte) ... |
+footer JSON (offset & panjang tiap tabel, metadata) | panjang footer (8 byte) | MAGIC.
+File di disk dibuka dengan memory map; tabel baru dibaca saat diminta.
+"""
+import json
+import os
+import tempfile
+from datetime import datetime, timezone
+
+import pyarrow as pa
+import pyarrow.ipc
+
+from smartrab.schema import SCHEMAS, apply_schema
+
+MAGIC = b'SRABPRJ1'
+FORMAT_VERSION = 1
+EXTENSION = '.srab'
+ALIGN = 64
+META_KEYS = ('project_name', 'project_loc', 'project_year', 'global_overhead')
+
+class ProjectError(ValueError):
+    """File bukan proyek SmartRAB / rusak / versi tidak didukung"""
+
+def _ipc_bytes(df):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+def write_project(target, tables, meta=None):
+    """
+    Tulis proyek ke path (atomik) atau objek file biner.
+    tables: {nama: DataFrame}; meta: dict yang bisa di-JSON-kan.
+    """
+    if isinstance(target, (str, os.PathLike)):
+        directory = os.path.dirname(os.path.abspath(target))
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as fh: write_project(fh, tables, meta)
+            os.replace(tmp, target)
+        except BaseException:
+            if os.path.exists(tmp): os.remove(tmp)
+            raise
+        return
+    footer = {'format': FORMAT_VERSION, 'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+              'meta': dict(meta or {}), 'tables': {}}
+    target.write(MAGIC)
+    pos = len(MAGIC)
+    for name, df in tables.items():
+        if df is None: continue
+        pad = -pos % ALIGN
+        target.write(b'\0' * pad)
+        pos += pad
+        buf = _ipc_bytes(df)
+        target.write(buf)
+        footer['tables'][name] = {'offset': pos, 'length': buf.size, 'rows': len(df)}
+        pos += buf.size
+    data = json.dumps(footer, ensure_ascii=False).encode()
+    target.write(data + len(data).to_bytes(8, 'little') + MAGIC)
+
+def project_bytes(tables, meta=None):
+    """write_project ke bytes (untuk tombol download)"""
+    sink = pa.BufferOutputStream()
+    write_project(sink, tables, meta)
+    return sink.getvalue().to_pybytes()
+
+class ProjectBundle:
+    """
+    Proyek yang sudah dibuka. source: path (memory map) atau bytes / objek file upload.
+    Tabel di-materialisasi ke DataFrame hanya saat table() dipanggil, lalu disimpan.
+    """
+    def __init__(self, source):
+        if isinstance(source, (str, os.PathLike)):
+            self.buffer = pa.memory_map(os.fspath(source), 'r').read_buffer()
+        else:
+            data = source.getvalue() if hasattr(source, 'getvalue') else source
+            self.buffer = pa.py_buffer(data)
+        tail = len(MAGIC) + 8
+        if self.buffer.size < len(MAGIC) + tail or self.buffer[:len(MAGIC)].to_pybytes() != MAGIC \
+                or self.buffer[-len(MAGIC):].to_pybytes() != MAGIC:
+            raise ProjectError("Bukan file proyek SmartRAB (.srab)")
+        n = int.from_bytes(self.buffer[-tail:-len(MAGIC)].to_pybytes(), 'little')
+        body = self.buffer.size - len(MAGIC) - tail   # batas footer: setelah MAGIC awal
+        try:
+            if n > body: raise ValueError(n)
+            footer = json.loads(self.buffer[-tail - n:-tail].to_pybytes())
+            version = footer.get('format')
+            entries = footer['tables'] if version == FORMAT_VERSION else {}
+            if not isinstance(footer.get('meta', {}), dict): raise ValueError('meta')
+            for e in entries.values():
+                if not (len(MAGIC) <= e['offset'] and e['offset'] + e['length'] <= len(MAGIC) + body - n): raise ValueError(e)
+                int(e['rows'])
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            raise ProjectError("File proyek rusak / terpotong (footer tidak terbaca)") from e
+        if version != FORMAT_VERSION:
+            raise ProjectError(f"Versi file proyek {version} tidak didukung")
+        self.created = footer.get('created')
+        self.meta = footer.get('meta', {})
+        self.entries = entries
+        self._frames = {}
+
+    def __contains__(self, name):
+        return name in self.entries
+
+    def rows(self, name):
+        return self.entries[name]['rows'] if name in self.entries else 0
+
+    def arrow(self, name):
+        """Tabel Arrow tanpa salinan (menunjuk langsung ke memory map / buffer); divalidasi penuh sebelum dipakai"""
+        e = self.entries[name]
+        try:
+            table = pa.ipc.open_file(self.buffer.slice(e['offset'], e['length'])).read_all()
+            table.validate(full=True)
+            return table
+        except pa.ArrowException as err:
+            raise ProjectError(f"Tabel '{name}' di file proyek rusak") from err
+
+    def table(self, name):
+        """DataFrame untuk satu tabel (skema bertipe diterapkan bila dikenal); None jika tidak ada"""
+        if name not in self.entries: return None
+        if name not in self._frames:
+            df = self.arrow(name).to_pandas(split_blocks=True)
+            self._frames[name] = apply_schema(df, name) if name in SCHEMAS else df
+        return self._frames[name]
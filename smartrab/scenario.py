@@ -0,0 +1,92 @@
+"""
+Skenario what-if: banyak set parameter (overhead, indeks harga daerah, eskalasi
+per Kategori Upah/Material/Alat, PPN) dihitung sekaligus sebagai perkalian matriks
+skenario x Kode_Analisa, memakai analisa detail yang sudah dicocokkan (tanpa
+re-match / recalc per skenario).
+
+    biaya kode per kategori  S[kode, kat]   (Subtotal sebelum overhead)
+    pengali skenario         M[sken, kat] = indeks * (1 + eskalasi_kat) * (1 + overhead)
+    harga satuan             U = M @ S.T
+    total divisi             D = U @ V.T    (V[divisi, kode] = jumlah volume RAB)
+"""
+from itertools import product
+
+import numpy as np
+import pandas as pd
+
+from smartrab.schema import plain
+
+CATEGORIES = ('Upah', 'Material', 'Alat')
+DEFAULT_PPN = 11.0
+NO_DIVISION = 'Tanpa Divisi'
+SCENARIO_COLS = ['Skenario', 'Overhead', 'Indeks_Harga'] + [f'Eskalasi_{k}' for k in CATEGORIES] + ['PPN']
+SCENARIO_DEFAULTS = {'Overhead': 15.0, 'Indeks_Harga': 1.0, 'PPN': DEFAULT_PPN, **{f'Eskalasi_{k}': 0.0 for k in CATEGORIES}}
+
+def parse_numbers(text):
+    """'0,95; 1; 1.1' -> [0.95, 1.0, 1.1] (pemisah ';', koma desimal boleh)"""
+    out = []
+    for part in str(text or '').split(';'):
+        part = part.strip().replace(',', '.')
+        if part: out.append(float(part))
+    return out
+
+def scenario_grid(overheads, indices=(1.0,), ppns=(DEFAULT_PPN,), escalation=None):
+    """Semua kombinasi overhead x indeks harga x PPN (eskalasi per kategori sama untuk semua, dalam %)"""
+    escalation = escalation or {}
+    rows = []
+    for i, (ov, idx, ppn) in enumerate(product(overheads, indices, ppns), 1):
+        rows.append({'Skenario': f"S{i}: OH {ov:g}% · indeks {idx:g} · PPN {ppn:g}%", 'Overhead': ov, 'Indeks_Harga': idx,
+                     **{f'Eskalasi_{k}': float(escalation.get(k, 0.0)) for k in CATEGORIES}, 'PPN': ppn})
+    return pd.DataFrame(rows, columns=SCENARIO_COLS)
+
+def normalize_scenarios(scenarios):
+    """Lengkapi kolom parameter yang kosong dengan default; nama skenario kosong / ganda diberi nomor"""
+    sc = pd.DataFrame(scenarios).reset_index(drop=True)
+    for c, v in SCENARIO_DEFAULTS.items():
+        sc[c] = pd.to_numeric(sc[c], errors='coerce').fillna(v) if c in sc.columns else v
+    names = sc['Skenario'] if 'Skenario' in sc.columns else pd.Series([None] * len(sc))
+    names = [str(n) if isinstance(n, str) and n.strip() else f"S{i}" for i, n in enumerate(names, 1)]
+    seen = {}
+    for i, n in enumerate(names):
+        seen[n] = seen.get(n, 0) + 1
+        if seen[n] > 1: names[i] = f"{n} ({seen[n]})"
+    sc['Skenario'] = names
+    return sc[SCENARIO_COLS]
+
+def category_costs(det):
+    """Subtotal (sebelum overhead) per Kode_Analisa x Kategori dari df_analysis_detailed"""
+    if det is None or det.empty: return pd.DataFrame(columns=list(CATEGORIES), dtype=float)
+    codes = plain(det['Kode_Analisa']).astype(str).str.strip()
+    kat = plain(det['Kategori']).fillna('Material').astype(str)
+    costs = det['Subtotal'].groupby([codes, kat]).sum().unstack(fill_value=0.0)
+    return costs[~costs.index.duplicated()]
+
+def division_volumes(df_rab):
+    """Jumlah Volume RAB per Divisi x Kode_Analisa_Ref"""
+    ref = df_rab['Kode_Analisa_Ref'].astype(str).str.strip()
+    div = plain(df_rab['Divisi']).fillna(NO_DIVISION).astype(str)
+    vol = pd.to_numeric(df_rab['Volume'], errors='coerce').fillna(0.0)
+    return vol.groupby([div, ref]).sum().unstack(fill_value=0.0)
+
+def run_scenarios(costs, df_rab, scenarios):
+    """
+    Hitung semua skenario sekaligus.
+    Return: (ringkasan per skenario: parameter + Total_Fisik, PPN_Rp, Grand_Total, Selisih_Persen vs skenario pertama;
+             total per Divisi: index Skenario x kolom Divisi)
+    """
+    sc = normalize_scenarios(scenarios)
+    vols = division_volumes(df_rab)
+    s = costs.reindex(index=vols.columns, fill_value=0.0).fillna(0.0)  # kode tanpa analisa -> harga 0
+    esc = np.column_stack([1 + sc[f'Eskalasi_{k}'].to_numpy() / 100 if k in CATEGORIES else np.ones(len(sc))
+                           for k in s.columns]) if len(s.columns) else np.ones((len(sc), 0))
+    mult = esc * (sc['Indeks_Harga'].to_numpy() * (1 + sc['Overhead'].to_numpy() / 100))[:, None]
+    unit = mult @ s.to_numpy().T                 # skenario x kode
+    div_totals = unit @ vols.to_numpy().T        # skenario x divisi
+    divisions = pd.DataFrame(div_totals, index=pd.Index(sc['Skenario'], name='Skenario'), columns=vols.index)
+    summary = sc.copy()
+    summary['Total_Fisik'] = div_totals.sum(axis=1)
+    summary['PPN_Rp'] = summary['Total_Fisik'] * summary['PPN'] / 100
+    summary['Grand_Total'] = summary['Total_Fisik'] + summary['PPN_Rp']
+    base = summary['Grand_Total'].iloc[0] if len(summary) else 0.0
+    summary['Selisih_Persen'] = (summary['Grand_Total'] / base - 1) * 100 if base else 0.0
+    return summary, divisions
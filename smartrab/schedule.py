@@ -0,0 +1,76 @@
+"""
+Jadwal & Kurva S (vektorisasi).
+Bobot tiap item dibagi rata sepanjang durasinya: item aktif di minggu w jika
+Minggu_Mulai <= w < Minggu_Mulai + Durasi_Minggu. Kurva dihitung dengan
+difference array + cumsum (O(item + minggu)), bukan loop minggu x item.
+"""
+from itertools import accumulate
+
+import numpy as np
+import pandas as pd
+
+def _schedule_arrays(df_rab):
+    """Kolom jadwal sebagai array float + rentang minggu aktif [first, end) per item"""
+    total = pd.to_numeric(df_rab['Total_Harga'], errors='coerce').to_numpy(dtype=float)
+    start = pd.to_numeric(df_rab['Minggu_Mulai'], errors='coerce').to_numpy(dtype=float)
+    dur = pd.to_numeric(df_rab['Durasi_Minggu'], errors='coerce').to_numpy(dtype=float)
+    grand = np.nansum(total)
+    bobot = total / grand * 100 if grand else np.zeros(len(total))
+    
+    last = start + dur - 1
+    max_week = int(np.nanmax(last)) if np.isfinite(last).any() else 1
+    if max_week < 1: max_week = 1
+    n_weeks = max_week + 1  # minggu 1 .. max_week+1 (satu minggu ekstra seperti kurva lama)
+    
+    # Minggu integer w aktif jika start <= w < start + dur
+    ok = np.isfinite(start) & np.isfinite(dur) & (dur > 0)
+    first = np.where(ok, np.clip(np.ceil(start), 1, n_weeks + 1), 0).astype(np.int64)
+    end = np.where(ok, np.clip(np.ceil(start + dur), 1, n_weeks + 1), 0).astype(np.int64)
+    end = np.maximum(end, first)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rate_bobot = np.where(ok, bobot / dur, 0.0)
+        rate_biaya = np.where(ok, total / dur, 0.0)
+    return n_weeks, first, end, np.nan_to_num(rate_bobot), np.nan_to_num(rate_biaya)
+
+def s_curve(df_rab):
+    """
+    Kurva S mingguan: Minggu, Bobot (% minggu tsb), Progress (% kumulatif, maks 100),
+    Biaya (rencana cash flow minggu tsb) & Biaya_Kumulatif.
+    """
+    n_weeks, first, end, rate_bobot, rate_biaya = _schedule_arrays(df_rab)
+    
+    # Difference array: +rate di minggu mulai, -rate setelah minggu terakhir
+    diff_b = np.zeros(n_weeks + 2)
+    diff_c = np.zeros(n_weeks + 2)
+    np.add.at(diff_b, first, rate_bobot); np.add.at(diff_b, end, -rate_bobot)
+    np.add.at(diff_c, first, rate_biaya); np.add.at(diff_c, end, -rate_biaya)
+    weekly_b = np.cumsum(diff_b)[1:n_weeks + 1]
+    weekly_c = np.cumsum(diff_c)[1:n_weeks + 1]
+    
+    progress = list(accumulate(weekly_b, lambda cum, val: min(cum + val, 100), initial=0))[1:]
+    return pd.DataFrame({
+        'Minggu': np.arange(1, n_weeks + 1), 'Bobot': weekly_b, 'Progress': progress,
+        'Biaya': weekly_c, 'Biaya_Kumulatif': np.cumsum(weekly_c)
+    })
+
+def weekly_plan(df_rab):
+    """
+    Rencana mingguan per item (format panjang, satu baris per item x minggu aktif):
+    No, Divisi, Uraian_Pekerjaan, Minggu, Bobot, Biaya.
+    Dipakai bersama oleh tampilan cash flow & export Excel.
+    """
+    _, first, end, rate_bobot, rate_biaya = _schedule_arrays(df_rab)
+    counts = end - first
+    item = np.repeat(np.arange(len(counts)), counts)
+    offset = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    plan = df_rab[['No', 'Divisi', 'Uraian_Pekerjaan']].iloc[item].reset_index(drop=True)
+    plan['Minggu'] = first[item] + offset
+    plan['Bobot'] = rate_bobot[item]
+    plan['Biaya'] = rate_biaya[item]
+    return plan
+
+def division_cashflow(plan):
+    """Pivot rencana biaya mingguan per Divisi (baris) x Minggu (kolom)"""
+    if plan.empty: return pd.DataFrame()
+    divisi = plan['Divisi'].fillna('Umum').astype(str)
+    return plan.pivot_table(index=divisi, columns='Minggu', values='Biaya', aggfunc='sum', fill_value=0.0)
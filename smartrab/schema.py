@@ -0,0 +1,75 @@
+"""
+Skema bertipe untuk tabel inti (df_prices, df_analysis, df_analysis_detailed, df_rab).
+Teks berulang disimpan sebagai kategori (kamus string + kode integer), angka
+sebagai float64 / int32. Skema diterapkan saat ingest & dipertahankan oleh mesin hitung,
+sehingga satu set AHSP nasional per sesi memakan memori jauh lebih kecil.
+"""
+import numpy as np
+import pandas as pd
+
+CATEGORY, FLOAT, INT, TEXT = 'category', 'float64', 'int32', 'object'
+
+SCHEMAS = {
+    # Komponen & Kode di tabel harga praktis unik per baris -> tetap teks
+    'prices': {'Kode': TEXT, 'Komponen': TEXT, 'Satuan': CATEGORY, 'Harga_Dasar': FLOAT, 'Kategori': CATEGORY},
+    'analysis': {'Kode_Analisa': CATEGORY, 'Uraian_Pekerjaan': CATEGORY, 'Komponen': CATEGORY,
+                 'Koefisien': FLOAT, 'Divisi_Ref': CATEGORY},
+    # RAB kecil & sering diedit -> teks biasa, hanya angka yang bertipe
+    'rab': {'No': INT, 'Divisi': TEXT, 'Uraian_Pekerjaan': TEXT, 'Kode_Analisa_Ref': TEXT, 'Satuan_Pek': TEXT,
+            'Volume': FLOAT, 'Harga_Satuan_Jadi': FLOAT, 'Total_Harga': FLOAT, 'Durasi_Minggu': INT, 'Minggu_Mulai': INT},
+}
+SCHEMAS['analysis_detailed'] = {**SCHEMAS['analysis'], 'Key_Raw': CATEGORY, 'Harga_Dasar': FLOAT,
+                                'Satuan': CATEGORY, 'Kategori': CATEGORY, 'Subtotal': FLOAT}
+
+def is_category(s):
+    return isinstance(s.dtype, pd.CategoricalDtype)
+
+def _cast(s, kind):
+    if kind == CATEGORY:
+        return s if is_category(s) else s.astype('category')
+    if kind == TEXT:
+        return s.astype(object) if is_category(s) else s
+    num = pd.to_numeric(s, errors='coerce')
+    if kind == INT:
+        # int32 hanya jika semua bulat & tidak ada yang kosong (NaN tetap bermakna di jadwal)
+        vals = num.to_numpy(dtype=float)
+        if np.isfinite(vals).all() and (vals == np.round(vals)).all(): return num.astype(np.int32)
+    return num.astype(np.float64)
+
+def apply_schema(df, table):
+    """DataFrame dengan kolom bertipe sesuai SCHEMAS[table]; kolom lain tidak disentuh"""
+    cols = {c: _cast(df[c], kind) for c, kind in SCHEMAS[table].items()
+            if c in df.columns and str(df[c].dtype) != kind}
+    return df.assign(**cols) if cols else df
+
+def empty_table(table):
+    """Tabel kosong dengan kolom & tipe sesuai skema (concat berikutnya tidak jatuh ke object)"""
+    return pd.DataFrame({c: pd.Series(dtype=kind) for c, kind in SCHEMAS[table].items()})
+
+def editable(df):
+    """Salinan untuk st.data_editor: kategori jadi teks agar nilai baru bisa diketik"""
+    cats = [c for c in df.columns if is_category(df[c])]
+    return df.astype({c: object for c in cats}) if cats else df
+
+def plain(s):
+    """Series kategori -> object (untuk .map / fillna dengan nilai di luar kategori)"""
+    return s.astype(object) if is_category(s) else s
+
+def assign_rows(df, rows, col, values):
+    """df.loc[rows, col] = values; kategori baru ditambahkan dulu bila kolomnya kategori"""
+    s = df[col]
+    if is_category(s):
+        new = pd.Index(pd.unique(np.asarray(values, dtype=object))).dropna().difference(s.cat.categories)
+        if len(new): df[col] = s.cat.add_categories(new)
+    df.loc[rows, col] = values
+
+def map_categories(s, fn):
+    """fn per nilai unik saja (bukan per baris); hasil kategori"""
+    if not is_category(s): s = s.astype('category')
+    mapped = np.array([fn(c) for c in s.cat.categories] + [fn(np.nan)], dtype=object)
+    return pd.Series(pd.Categorical(mapped[s.cat.codes.to_numpy()]), index=s.index)
+
+def analysis_headers(df):
+    """Tabel header analisa ternormalisasi: satu baris per Kode_Analisa (Uraian_Pekerjaan, Divisi_Ref)"""
+    cols = [c for c in ('Kode_Analisa', 'Uraian_Pekerjaan', 'Divisi_Ref') if c in df.columns]
+    return df[cols].drop_duplicates(subset=['Kode_Analisa']).reset_index(drop=True)
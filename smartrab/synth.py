@@ -0,0 +1,95 @@
+"""
+Generator data sintetis yang realistis untuk benchmark & uji beban:
+CSV Harga Dasar (format Rp, kode M./L./E.), CSV Analisa per divisi
+(header A.x.y.z + baris koefisien) dan tabel RAB dengan ukuran bebas.
+Semua deterministik per seed.
+"""
+import numpy as np
+import pandas as pd
+
+from smartrab.engine import RAB_COLS
+from smartrab.parser import NamedBytesIO
+
+# (prefix kode, Kategori, satuan, rentang harga, nama dasar)
+PRICE_GROUPS = [
+    ('L', 'Upah', ['OH'], (90_000, 250_000), ['Pekerja', 'Tukang Batu', 'Tukang Kayu', 'Tukang Besi', 'Mandor', 'Kepala Tukang']),
+    ('M', 'Material', ['kg', 'm3', 'bh', 'zak', 'lbr', 'm2'], (1_000, 2_500_000),
+     ['Semen Portland', 'Pasir Pasang', 'Batu Kali', 'Bata Merah', 'Besi Beton', 'Kayu Kelas II', 'Keramik', 'Cat Tembok', 'Paku', 'Pipa PVC']),
+    ('E', 'Alat', ['jam', 'hari'], (50_000, 1_500_000), ['Concrete Mixer', 'Excavator', 'Vibrator', 'Stamper', 'Dump Truck']),
+]
+# Nama file memicu detect_division (lihat parser.detect_division)
+DIVISION_FILES = ['persiapan', 'galian_tanah', 'pondasi_beton', 'dinding_plesteran', 'kusen_pintu',
+                  'atap_plafon', 'pengecatan', 'sanitair_pipa', 'listrik']
+
+def rupiah(v):
+    """125000 -> 'Rp 125.000'"""
+    return 'Rp ' + f"{int(v):,}".replace(',', '.')
+
+def price_table(n, seed=0):
+    """DataFrame Kode, Komponen, Satuan, Harga (n komponen unik, campuran Upah/Material/Alat)"""
+    rng = np.random.default_rng(seed)
+    weights = np.array([0.2, 0.65, 0.15])
+    group = rng.choice(len(PRICE_GROUPS), size=n, p=weights)
+    rows = []
+    for i, g in enumerate(group):
+        prefix, _, units, (lo, hi), names = PRICE_GROUPS[g]
+        rows.append((f"{prefix}.{i // 100 + 1:02d}.{i % 100 + 1:03d}", f"{names[i % len(names)]} tipe {i}",
+                     units[i % len(units)], float(rng.integers(lo, hi))))
+    return pd.DataFrame(rows, columns=['Kode', 'Komponen', 'Satuan', 'Harga'])
+
+def price_csv(prices):
+    """CSV Harga Dasar seperti lampiran HSPK: No, Kode, Uraian, Satuan, Harga ('Rp 1.234.567')"""
+    lines = ['No,Kode,Uraian Bahan / Upah,Satuan,Harga Satuan']
+    for i, (kode, komp, sat, harga) in enumerate(prices.itertuples(index=False), 1):
+        lines.append(f'{i},{kode},{komp},{sat},"{rupiah(harga)}"')
+    return '\n'.join(lines).encode()
+
+def analysis_csvs(n_rows, prices, n_files=4, comps_per_item=6, seed=0):
+    """
+    CSV Analisa per divisi: baris header 'A.d.x.y,Uraian' diikuti baris komponen
+    ',Komponen,koefisien (koma desimal),Satuan'. Total ~n_rows baris komponen.
+    Return: [(nama file, bytes)]
+    """
+    rng = np.random.default_rng(seed + 1)
+    comps = prices[['Komponen', 'Satuan']].to_numpy()
+    n_items = max(1, n_rows // comps_per_item)
+    per_file = -(-n_items // n_files)
+    files, item = [], 0
+    for f in range(n_files):
+        div = f % len(DIVISION_FILES) + 1
+        lines = []
+        for _ in range(per_file):
+            if item >= n_items: break
+            lines.append(f"A.{div}.{item // 1000 + 1}.{item % 1000 + 1},Membuat 1 m3 pekerjaan {DIVISION_FILES[f % len(DIVISION_FILES)]} {item},,")
+            for k in rng.choice(len(comps), size=min(comps_per_item, len(comps)), replace=False):
+                coef = f"{rng.uniform(0.001, 50):.4f}".replace('.', ',')
+                lines.append(f',{comps[k][0]},"{coef}",{comps[k][1]}')
+            item += 1
+        if lines: files.append((f"{DIVISION_FILES[f % len(DIVISION_FILES)]}_{f + 1}.csv", '\n'.join(lines).encode()))
+    return files
+
+def rab_table(n, codes, seed=0):
+    """Tabel RAB n baris yang mereferensi Kode_Analisa acak dari codes"""
+    rng = np.random.default_rng(seed + 2)
+    codes = np.asarray(codes, dtype=object)
+    ref = codes[rng.integers(0, len(codes), size=n)] if len(codes) else np.full(n, '', dtype=object)
+    start = rng.integers(1, 40, size=n)
+    df = pd.DataFrame({
+        'No': np.arange(1, n + 1), 'Divisi': [f"Divisi {c.split('.')[1]}" if c else 'Umum' for c in ref],
+        'Uraian_Pekerjaan': [f"Pekerjaan {c}" for c in ref], 'Kode_Analisa_Ref': ref, 'Satuan_Pek': 'm3',
+        'Volume': np.round(rng.uniform(1, 500, size=n), 2), 'Harga_Satuan_Jadi': 0.0, 'Total_Harga': 0.0,
+        'Durasi_Minggu': rng.integers(1, 12, size=n), 'Minggu_Mulai': start
+    })
+    return df[RAB_COLS]
+
+def project(n_rows, seed=0, price_ratio=0.1, rab_ratio=0.05, n_files=4):
+    """
+    Satu set data proyek untuk n_rows baris analisa:
+    (files upload [NamedBytesIO], df_rab). Harga ~ n_rows*price_ratio, RAB ~ n_rows*rab_ratio baris.
+    """
+    prices = price_table(max(50, int(n_rows * price_ratio)), seed)
+    analyses = analysis_csvs(n_rows, prices, n_files=n_files, seed=seed)
+    files = [NamedBytesIO('harga_upah_bahan.csv', price_csv(prices))]
+    files += [NamedBytesIO(name, data) for name, data in analyses]
+    codes = [line.split(b',', 1)[0].decode() for _, data in analyses for line in data.split(b'\n') if line[:1] == b'A']
+    return files, rab_table(max(10, int(n_rows * rab_ratio)), codes, seed)
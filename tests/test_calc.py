@@ -0,0 +1,109 @@
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from smartrab import synth
+from smartrab.calc import FuzzyMatcher, IncrementalCalculator, PriceMatcher
+from smartrab.engine import merge_parse_results
+from smartrab.parser import parse_files
+from smartrab.profiling import Profiler
+from smartrab.schema import empty_table
+
+OVERHEAD = 15.0
+
+@pytest.fixture(scope='module')
+def project():
+    files, rab = synth.project(1500, seed=4)
+    prices, analysis, _ = merge_parse_results(empty_table('prices'), empty_table('analysis'), parse_files(files))
+    # Sebagian komponen analisa ditulis beda dari daftar harga (jalur substring & fuzzy)
+    comp = analysis['Komponen'].astype(object).to_numpy().copy()
+    for i in range(0, len(comp), 3):
+        comp[i] = ' '.join(comp[i].split()[::-1]) if i % 2 else comp[i] + ' x'
+    analysis = analysis.assign(Komponen=comp)
+    return prices, analysis, rab
+
+def assert_same_as_full(calc, prices, analysis, rab):
+    det, df_r, _ = calc.recalc(prices, analysis, rab, OVERHEAD)   # rekap material None = tidak berubah
+    full = IncrementalCalculator().recalc(prices, analysis, rab, OVERHEAD)
+    # Kategori yang ditambah inkremental (assign_rows) ada di belakang; urutan kategori bukan bagian hasil
+    pd.testing.assert_frame_equal(det, full[0], check_categorical=False)
+    pd.testing.assert_frame_equal(df_r, full[1])
+    # Rekap gabungan inkremental boleh kehilangan dtype kategori; nilainya harus sama
+    pd.testing.assert_frame_equal(calc.mat.reset_index(), full[2], check_dtype=False, check_categorical=False)
+
+def test_incremental_matches_full_recalc_after_edits(project):
+    prices, analysis, rab = project
+    calc = IncrementalCalculator()
+    assert_same_as_full(calc, prices, analysis, rab)
+    rng = np.random.default_rng(0)
+
+    prices = prices.copy()                                         # ubah harga
+    prices.loc[prices.index[:20], 'Harga_Dasar'] *= 1.5
+    assert_same_as_full(calc, prices, analysis, rab)
+    prices = pd.concat([prices, prices.iloc[:5].assign(Komponen=lambda d: d['Komponen'] + ' baru')], ignore_index=True)
+    assert_same_as_full(calc, prices, analysis, rab)              # tambah harga
+    prices = prices.drop(prices.index[rng.choice(len(prices), 15, replace=False)]).reset_index(drop=True)
+    assert_same_as_full(calc, prices, analysis, rab)              # hapus harga
+    prices = prices.copy()
+    prices.loc[prices.index[3:8], 'Komponen'] = prices.loc[prices.index[3:8], 'Komponen'] + ' rev'
+    assert_same_as_full(calc, prices, analysis, rab)              # ganti nama
+
+    analysis = analysis.copy()                                     # ubah koefisien
+    analysis.loc[analysis.index[:30], 'Koefisien'] *= 2
+    assert_same_as_full(calc, prices, analysis, rab)
+    analysis = pd.concat([analysis, analysis.iloc[10:14]], ignore_index=True)
+    assert_same_as_full(calc, prices, analysis, rab)              # tambah baris analisa
+    analysis = analysis.drop(analysis.index[rng.choice(len(analysis), 25, replace=False)]).reset_index(drop=True)
+    assert_same_as_full(calc, prices, analysis, rab)              # hapus baris analisa
+
+    rab = rab.copy()                                               # ubah volume, tambah & hapus RAB
+    rab.loc[rab.index[:5], 'Volume'] += 10
+    assert_same_as_full(calc, prices, analysis, rab)
+    rab = pd.concat([rab, rab.iloc[:3]], ignore_index=True).drop(rab.index[10:13]).reset_index(drop=True)
+    assert_same_as_full(calc, prices, analysis, rab)
+
+def test_unchanged_price_table_is_not_renormalized(project):
+    prices, analysis, rab = project
+    calc = IncrementalCalculator()
+    calc.recalc(prices, analysis, rab, OVERHEAD)
+    calc.profiler = Profiler(enabled=True)
+    rab = rab.copy()
+    rab.loc[rab.index[0], 'Volume'] += 1
+    calc.recalc(prices, analysis, rab, OVERHEAD)
+    assert not any(r['stage'].endswith('normalize_keys') for r in calc.profiler.records)
+
+def find_best_price(key_search, keys, prices, satuans, kategoris):
+    """Scan linear versi awal calculate_system (acuan PriceMatcher)"""
+    price_dict, satuan_dict, kategori_dict = dict(zip(keys, prices)), dict(zip(keys, satuans)), dict(zip(keys, kategoris))
+    if key_search in price_dict:
+        return price_dict[key_search], satuan_dict.get(key_search, '-'), kategori_dict.get(key_search, 'Material')
+    for k_db, price in price_dict.items():
+        if (key_search in k_db and len(key_search) > 3) or (k_db in key_search and len(k_db) > 3):
+            return price, satuan_dict.get(k_db, '-'), kategori_dict.get(k_db, 'Material')
+    return 0.0, '-', 'Material'
+
+def test_price_matcher_matches_linear_scan():
+    rng = random.Random(7)
+    words = ['semen', 'semen portland', 'pasir', 'pasir pasang', 'pasir beton', 'besi', 'besi beton', 'beton',
+             'bata', 'bata merah', 'cat', 'kayu', 'kayu kelas ii', 'tukang', 'tukang batu', 'ton', 'on', 'abc']
+    keys = [rng.choice(words) + rng.choice(['', ' 40kg', ' d10', ' d13', ' tipe a', '']) for _ in range(300)]
+    keys += ['semen', 'beton', 'ton', 'pasir']      # key ganda: posisi pertama, nilai terakhir
+    prices = [float(i) for i in range(len(keys))]
+    satuans = [rng.choice(['kg', 'm3', 'OH']) for _ in keys]
+    kategoris = [rng.choice(['Material', 'Upah', 'Alat']) for _ in keys]
+    matcher = PriceMatcher(keys, prices, satuans, kategoris)
+    queries = set(keys) | {w for w in words} | {'', 'x', 'sem', 'semen portland 40kg extra', 'besi beton d10 ulir',
+                                                  'cat tembok', 'kayu kelas ii meranti', 'beton k-225', 'pasir pasang halus'}
+    queries |= {k[1:] for k in keys} | {k[:-1] for k in keys} | {'pre ' + k for k in keys}
+    for q in sorted(queries):
+        assert matcher.lookup(q) == find_best_price(q, keys, prices, satuans, kategoris), q
+
+def test_fuzzy_never_matches_a_different_size():
+    keys = ['besi beton d10', 'besi beton d13', 'semen portland 40 kg', 'pasir beton']
+    got = FuzzyMatcher(keys).match_batch(['beton besi d13', 'besi beton d16', 'besi beton', 'portland semen 40kg'])
+    assert got['beton besi d13'][0] == 'besi beton d13'
+    assert got['besi beton d16'][0] is None          # skor teks ~93, tapi ukuran berbeda
+    assert got['besi beton'][0] is None              # tanpa angka tidak diarahkan ke salah satu ukuran
+    assert got['portland semen 40kg'][0] == 'semen portland 40 kg'
@@ -0,0 +1,16 @@
+from smartrab import synth
+from smartrab.jobs import DONE, ImportJob
+from smartrab.profiling import Profiler
+
+def test_background_import_records_into_session_profiler():
+    files, _ = synth.project(400, seed=1)
+    prof = Profiler(enabled=True)
+    job = ImportJob(files, profiler=prof).start()
+    job.join(30)
+    assert job.state == DONE
+    merged = []
+    assert job.commit(merged.extend) == len(files)
+    assert len(merged) == len(files)
+    stages = [r['stage'] for r in prof.records]
+    assert 'import' in stages and 'import_commit' in stages
+    assert sum(s.startswith('import/file:') and s.count('/') == 1 for s in stages) == len(files)
@@ -0,0 +1,31 @@
+import threading
+
+import pytest
+
+from smartrab.master import MasterRegistry
+
+def test_failed_build_is_cleaned_up_and_can_be_retried():
+    reg = MasterRegistry()
+    calls = []
+    def failing():
+        calls.append('fail')
+        raise ValueError('file rusak')
+    with pytest.raises(ValueError):
+        reg.get_or_build('k', failing)
+    assert reg._building == {} and reg.get('k') is None
+    cat = object()
+    assert reg.get_or_build('k', lambda: calls.append('ok') or cat) is cat
+    assert calls == ['fail', 'ok'] and reg._building == {}
+
+def test_concurrent_requests_build_once():
+    reg, calls, gate = MasterRegistry(), [], threading.Event()
+    def build():
+        calls.append(1)
+        gate.wait(5)
+        return 'cat'
+    out = []
+    threads = [threading.Thread(target=lambda: out.append(reg.get_or_build('k', build))) for _ in range(6)]
+    for t in threads: t.start()
+    gate.set()
+    for t in threads: t.join(5)
+    assert calls == [1] and out == ['cat'] * 6 and reg._building == {}
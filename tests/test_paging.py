@@ -0,0 +1,14 @@
+import pandas as pd
+
+from smartrab.engine import RAB_DEFAULTS
+from smartrab.paging import apply_editor_delta
+
+def test_added_rows_get_consecutive_numbers():
+    df = pd.DataFrame({'No': [1, 2, 3], 'Uraian_Pekerjaan': ['a', 'b', 'c'], 'Volume': [1.0, 2.0, 3.0]})
+    state = {'added_rows': [{'Uraian_Pekerjaan': 'd'}, {'Uraian_Pekerjaan': 'e', 'No': 10}, {'Uraian_Pekerjaan': 'f'}],
+             'deleted_rows': [0]}
+    out = apply_editor_delta(df, [0, 1, 2], state, RAB_DEFAULTS, counter='No')
+    assert out['Uraian_Pekerjaan'].tolist() == ['b', 'c', 'd', 'e', 'f']
+    assert out['No'].tolist() == [2, 3, 4, 10, 6]
+    assert out['Volume'].tolist() == [2.0, 3.0, 0.0, 0.0, 0.0]
+    assert df['No'].tolist() == [1, 2, 3]
@@ -0,0 +1,98 @@
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from smartrab import synth
+from smartrab.parse_cache import ParseCache
+from smartrab.parser import (NamedBytesIO, clean_currency, clean_currency_series, extract_analysis_rows,
+                             extract_analysis_rows_columnar, extract_price_rows, extract_price_rows_columnar,
+                             parse_files, read_raw_csv)
+
+CURRENCY_CASES = ['Rp 1.000', 'Rp\xa01.000', '\xa0Rp 12.500\xa0', 'Rp. 1.250,50', '1.250,50', '75', '50', 'abc', '', 'M.01.001', '2025']
+
+@pytest.mark.parametrize('text', CURRENCY_CASES)
+def test_clean_currency_series_matches_scalar(text):
+    assert clean_currency_series(pd.Series([text], dtype=object))[0] == clean_currency(text)
+
+def assert_same_prices(df_raw):
+    row = extract_price_rows(df_raw).reset_index(drop=True)
+    col = extract_price_rows_columnar(df_raw).reset_index(drop=True)
+    assert list(row.columns) == list(col.columns)
+    for c in row.columns:
+        assert np.array_equal(row[c].to_numpy(dtype=object), col[c].to_numpy(dtype=object)), c
+
+def test_price_extractors_agree_on_mixed_rows():
+    df_raw = pd.DataFrame([
+        ['1', 'L.01.001', 'Pekerja', 'OH', 'Rp 125.000'],
+        ['2', 'M.02.003', 'Semen Portland', 'zak', 'Rp\xa065.000'],
+        ['3', 'E.01.002', 'Concrete Mixer', 'jam', '1.250,50'],
+        [None, None, 'Judul Bagian', None, None],
+        ['4', None, 'Pasir', 'm3', '40'],
+        ['5', 'M.03', 'Bata Merah', 'bh', 'Rp 900'],
+    ], dtype=object)
+    assert_same_prices(df_raw)
+
+def test_price_extractors_agree_on_generated_price_list():
+    rng = random.Random(3)
+    lines = ['No,Kode,Uraian,Satuan,Harga']
+    for i in range(300):
+        code = f"{rng.choice('MLE')}.{i // 50:02d}.{i:03d}" if rng.random() < 0.8 else ''
+        price = rng.choice([f"Rp {rng.randint(1, 9999) * 100:,}".replace(',', '.'), str(rng.randint(10, 99999)), ''])
+        lines.append(f"{i + 1},{code},Komponen {rng.choice(['Semen', 'Pasir', 'Tukang'])} {i},{rng.choice(['kg', 'OH', 'm3', ''])},{price}")
+    assert_same_prices(read_raw_csv(NamedBytesIO('harga_upah_bahan.csv', '\n'.join(lines).encode())))
+
+def test_price_extractors_agree_on_synthetic_price_list():
+    data = synth.price_csv(synth.price_table(300, seed=3))
+    assert_same_prices(read_raw_csv(NamedBytesIO('harga_upah_bahan.csv', data)))
+
+def assert_same_frame(row, col):
+    row, col = row.reset_index(drop=True), col.reset_index(drop=True)
+    assert list(row.columns) == list(col.columns)
+    for c in row.columns:
+        assert np.array_equal(row[c].to_numpy(dtype=object), col[c].to_numpy(dtype=object)), c
+
+IRREGULAR_ANALYSIS = (
+    'A.1.1.1,"Membuat 1 m3 beton, mutu K-175",,,\n'
+    ',Semen Portland,kg,"326,000",\n'
+    ',Pasir Beton,m3,0.52,Rp 250.000\n'
+    ',"Pekerja ""terampil""",OH,1.650,\n'
+    ',A.9,0.5\n'
+    ',ab,0.3\n'
+    'judul tanpa kode\n'
+    ',Mandor,OH,0.083,extra,kolom,lebih\n'
+    'A.1.1.2,Membuat 1 m2 bekisting,,\n'
+    ',Kayu kelas III,m3,0.04\n'
+    ',Paku 5-12 cm,kg,"0,4"\n'
+    ',,,\n'
+    ',Minyak bekisting,liter,abc\n'
+).encode()
+
+def assert_same_analysis(df_raw, name='analisa_divisi_3.csv'):
+    assert_same_frame(extract_analysis_rows(df_raw, name, 'Divisi 3'), extract_analysis_rows_columnar(df_raw, name, 'Divisi 3'))
+
+def test_analysis_extractors_agree_on_irregular_rows():
+    assert_same_analysis(read_raw_csv(NamedBytesIO('analisa.csv', IRREGULAR_ANALYSIS)))
+
+def test_analysis_extractors_agree_on_synthetic_files():
+    prices = synth.price_table(200, seed=5)
+    for name, data in synth.analysis_csvs(2000, prices, n_files=3, seed=5):
+        assert_same_analysis(read_raw_csv(NamedBytesIO(name, data)), name)
+
+def test_c_engine_matches_python_fallback_on_quoted_and_irregular_rows():
+    f = NamedBytesIO('analisa.csv', IRREGULAR_ANALYSIS)
+    fast, slow = read_raw_csv(f, fast=True), read_raw_csv(f, fast=False)
+    assert_same_analysis(fast)
+    assert_same_frame(extract_analysis_rows_columnar(fast, 'analisa.csv', 'Divisi 3'),
+                      extract_analysis_rows_columnar(slow, 'analisa.csv', 'Divisi 3'))
+
+def test_parse_cache_hit_equals_miss(tmp_path):
+    files, _ = synth.project(1000, seed=6)
+    cache = ParseCache(str(tmp_path))
+    miss = parse_files(files, cache=cache)
+    hit = parse_files(files, cache=cache)
+    assert len(list(tmp_path.iterdir())) == len(files)
+    for (k1, rows1, msg1), (k2, rows2, msg2) in zip(miss, hit):
+        assert k1 == k2 and msg2.startswith(msg1)     # pesan hit diberi penanda cache
+        assert_same_frame(rows1, rows2)
@@ -0,0 +1,63 @@
+import json
+
+import pandas as pd
+import pytest
+
+from smartrab.project import MAGIC, ProjectBundle, ProjectError, project_bytes, write_project
+from smartrab.schema import apply_schema
+from smartrab.synth import price_table, rab_table
+
+TAIL = len(MAGIC) + 8
+
+def tables():
+    prices = apply_schema(price_table(200), 'prices')
+    return {'prices': prices, 'rab': apply_schema(rab_table(50, list(prices['Kode'])), 'rab'),
+            'catatan': pd.DataFrame({'a': range(5), 'b': list('vwxyz')})}
+
+def with_footer(data, footer):
+    """File yang sama dengan footer JSON diganti"""
+    n = int.from_bytes(data[-TAIL:-len(MAGIC)], 'little')
+    return data[:-TAIL - n] + footer + len(footer).to_bytes(8, 'little') + MAGIC
+
+def assert_same(bundle, src):
+    assert set(bundle.entries) == set(src)
+    for name, df in src.items():
+        assert bundle.rows(name) == len(df)
+        pd.testing.assert_frame_equal(bundle.table(name), df)
+
+def test_roundtrip_bytes_and_path(tmp_path):
+    src, meta = tables(), {'project_name': 'Gedung A', 'overhead': 15}
+    bundle = ProjectBundle(project_bytes(src, meta))
+    assert bundle.meta == meta
+    assert_same(bundle, src)
+    path = tmp_path / 'proyek.srab'
+    write_project(path, src, meta)
+    assert_same(ProjectBundle(path), src)
+    assert list(tmp_path.iterdir()) == [path]               # tidak ada sisa file .tmp
+
+@pytest.mark.parametrize('mutate', [
+    lambda d: d[:len(d) // 2],                                             # terpotong
+    lambda d: d[:-TAIL - 3] + d[-TAIL:],                                   # footer terpotong
+    lambda d: d[:-TAIL] + (10 ** 12).to_bytes(8, 'little') + MAGIC,        # panjang footer mustahil
+    lambda d: b'PK\x03\x04' + d[4:],                                       # bukan file proyek
+    lambda d: with_footer(d, b'{"format": 1, "tables"'),
+    lambda d: with_footer(d, b'\xff\xfe'),
+    lambda d: with_footer(d, b'[1, 2]'),
+    lambda d: with_footer(d, json.dumps({'format': 1}).encode()),
+    lambda d: with_footer(d, json.dumps({'format': 9, 'tables': {}}).encode()),
+    lambda d: with_footer(d, json.dumps({'format': 1, 'tables': {
+        'rab': {'offset': 64, 'length': 10 ** 9, 'rows': 1}}}).encode()),
+])
+def test_corrupt_file_raises_project_error(mutate):
+    with pytest.raises(ProjectError):
+        ProjectBundle(mutate(project_bytes(tables())))
+
+def test_corrupt_table_raises_on_read():
+    data = bytearray(project_bytes(tables()))
+    e = ProjectBundle(bytes(data)).entries['rab']
+    end = e['offset'] + e['length']
+    data[end - 64:end] = b'\x07' * 64                      # footer IPC tabel rusak
+    bundle = ProjectBundle(bytes(data))                     # footer proyek masih utuh
+    pd.testing.assert_frame_equal(bundle.table('prices'), tables()['prices'])
+    with pytest.raises(ProjectError):
+        bundle.table('rab')
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+from smartrab.memo import MemoCache, TableVersions
+from smartrab.schedule import division_cashflow, s_curve, weekly_plan
+
+def baseline_curve(df):
+    """Loop minggu x item versi awal tab KURVA-S (acuan s_curve)"""
+    df = df.copy()
+    df['Bobot'] = (df['Total_Harga'] / df['Total_Harga'].sum()) * 100
+    max_week = max(int(df.apply(lambda x: x['Minggu_Mulai'] + x['Durasi_Minggu'] - 1, axis=1).max()), 1)
+    out, cum = [], 0
+    for w in range(1, max_week + 2):
+        val = 0
+        for _, r in df.iterrows():
+            if r['Minggu_Mulai'] <= w < (r['Minggu_Mulai'] + r['Durasi_Minggu']):
+                val += (r['Bobot'] / r['Durasi_Minggu'])
+        cum = min(cum + val, 100)
+        out.append(cum)
+    return out
+
+def rab(n=60, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'No': np.arange(1, n + 1), 'Divisi': rng.choice(['Divisi 1', 'Divisi 2', None], n),
+        'Uraian_Pekerjaan': [f"Item {i}" for i in range(n)], 'Total_Harga': rng.uniform(0, 1e7, n),
+        'Minggu_Mulai': rng.integers(1, 30, n), 'Durasi_Minggu': rng.integers(1, 10, n)
+    })
+
+def test_s_curve_matches_week_loop():
+    df = rab()
+    assert np.allclose(s_curve(df)['Progress'], baseline_curve(df))
+
+def test_weekly_plan_spreads_each_item_over_its_duration():
+    df = rab(seed=1)
+    plan = weekly_plan(df)
+    assert len(plan) == df['Durasi_Minggu'].sum()
+    assert np.allclose(plan.groupby('No')['Biaya'].sum().to_numpy(), df['Total_Harga'].to_numpy())
+    assert np.isclose(division_cashflow(plan).to_numpy().sum(), df['Total_Harga'].sum())
+    assert np.allclose(s_curve(df)['Biaya'].to_numpy(), plan.groupby('Minggu')['Biaya'].sum()
+                       .reindex(range(1, len(s_curve(df)) + 1), fill_value=0).to_numpy())
+
+def test_memo_cache_invalidates_on_table_version():
+    versions, memo, calls = TableVersions(), MemoCache(max_entries=2), []
+    df = rab()
+    def view(table):
+        key = ('s_curve', versions.get('df_rab', table))
+        return memo.get_or_compute(key, lambda: calls.append(1) or s_curve(table))
+    first = view(df)
+    assert view(df) is first and len(calls) == 1                # objek sama -> hit
+    changed = df.assign(Total_Harga=df['Total_Harga'] * 2)
+    assert view(changed) is not first and len(calls) == 2       # objek baru -> versi baru -> miss
+    versions.bump('df_rab', changed)
+    view(changed)
+    assert len(calls) == 3 and memo.hits == 1 and memo.misses == 3
+    assert len(memo) == 2                                       # LRU dibatasi max_entries